@@ -0,0 +1,47 @@
+"""
+Time of `birthdays-for 365` for 200k random birthdays computed by the day-by-day walk of
+BirthdayIndex and by birthday_vector; without NumPy only the walk is timed.
+Results of both paths are checked to be equal. Usage: python -m benchmarks.birthdays
+"""
+
+from datetime import date, datetime
+import random
+import timeit
+from console_bot import birthday_vector
+from console_bot.birthday_index import BirthdayIndex
+from console_bot.birthdays_per_week import BirthdayCalendar
+
+BIRTHDAYS = 200_000
+REPEAT = 3
+
+
+def make_index():
+    random.seed(0)
+    index = BirthdayIndex()
+    for number in range(BIRTHDAYS):
+        ordinal = random.randint(date(1950, 1, 1).toordinal(), date(2005, 12, 31).toordinal())
+        index.set(f"Contact {number}", datetime.fromordinal(ordinal))
+    return index
+
+
+def run(index, vectorized):
+    calendar = BirthdayCalendar(index, vectorized=vectorized)
+    # a new calendar computes the upcoming list before answering the window
+    return calendar.window(365)
+
+
+def main():
+    index = make_index()
+    print(f"{BIRTHDAYS} birthdays, best of {REPEAT}")
+    python_time = min(timeit.repeat(lambda: run(index, False), number=1, repeat=REPEAT))
+    print(f"pure Python: {python_time:.3f} s")
+    if not birthday_vector.available:
+        print("NumPy: not installed, the pure Python path is used")
+        return
+    numpy_time = min(timeit.repeat(lambda: run(index, True), number=1, repeat=REPEAT))
+    print(f"NumPy:       {numpy_time:.3f} s")
+    assert run(index, True) == run(index, False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Average traced memory of a record after AddressBook.from_dict loads 100k of them, to compare
+record layouts (e.g. with and without __slots__): python -m benchmarks.memory_per_record
+"""
+
+import tracemalloc
+from console_bot.address_book import AddressBook
+
+RECORDS = 100_000
+
+
+def record_data(index: int):
+    return {
+        "name": f"Contact{index}",
+        "birthday": "21.03.1993",
+        "phones": [f"{index:010d}"],
+        "emails": [f"contact{index}@example.com"],
+        "addresses": [f"Kyiv, Khreshchatyk {index}"],
+    }
+
+
+def main():
+    data = {f"Contact{index}": record_data(index) for index in range(RECORDS)}
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    book = AddressBook.from_dict(data)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the book dict itself and field values shared with `data` are included
+    print(f"{len(book)} records: {(after - before) / RECORDS:.0f} bytes per record")
+
+
+if __name__ == "__main__":
+    main()
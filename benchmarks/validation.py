@@ -0,0 +1,55 @@
+"""
+Nanoseconds per value for 100k phones, emails and dates checked the old way (re.search, re.match
+and strptime for every value, field setters) and by the batched validators and from_values.
+Started as a module, python -m benchmarks.validation, so console_bot is importable.
+"""
+
+from datetime import datetime
+import re
+import timeit
+from console_bot.address_book import Birthday, Email, Phone
+from console_bot.validators import parse_dates, validate_emails, validate_phones
+
+VALUES = 100_000
+PHONES = [f"{index:010d}" for index in range(VALUES)]
+EMAILS = [f"contact{index}@example.com" for index in range(VALUES)]
+DATES = [f"{index % 28 + 1:02d}.{index % 12 + 1:02d}.{1950 + index % 60}" for index in range(VALUES)]
+
+
+def old_phone(value):
+    return bool(re.search(r"^[0-9]{10}$", value) and len(value) == 10)
+
+
+def old_email(value):
+    return bool(re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", value))
+
+
+def old_date(value):
+    try:
+        return datetime.strptime(value, "%d.%m.%Y")
+    except ValueError:
+        return None
+
+
+CASES = [
+    ("phone: re.search per value", lambda: [old_phone(value) for value in PHONES]),
+    ("phone: Phone() setter", lambda: [Phone(value) for value in PHONES]),
+    ("phone: validate_phones", lambda: validate_phones(PHONES)),
+    ("phone: Phone.from_values", lambda: Phone.from_values(PHONES)),
+    ("email: re.match per value", lambda: [old_email(value) for value in EMAILS]),
+    ("email: validate_emails", lambda: validate_emails(EMAILS)),
+    ("email: Email.from_values", lambda: Email.from_values(EMAILS)),
+    ("date: strptime per value", lambda: [old_date(value) for value in DATES]),
+    ("date: parse_dates", lambda: parse_dates(DATES)),
+    ("date: Birthday.from_values", lambda: Birthday.from_values(DATES)),
+]
+
+
+def main():
+    for title, case in CASES:
+        seconds = min(timeit.repeat(case, number=1, repeat=3))
+        print(f"{title:30} {seconds / VALUES * 1e9:8.0f} ns per value")
+
+
+if __name__ == "__main__":
+    main()
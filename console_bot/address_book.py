@@ -1,21 +1,71 @@
 from collections import UserDict
+from contextlib import nullcontext
+from itertools import islice
 import re
 from faker import Faker
-from datetime import datetime
-from .birthdays_per_week import (
-    get_birthdays_per_week,
-    get_birthdays_in_next_days,
-    get_today_birthday,
-)
+from datetime import date
 import json
+from .birthday_index import BirthdayIndex
+from .birthdays_per_week import BirthdayCalendar, format_today
+from .binary_storage import BinarySnapshotStore, snapshot_from_json
+from .bulk import batched, read_records, write_records
+from .fuzzy import NameTree
+from .query import is_query, parse
+from .search_index import (
+    IndexMatches,
+    RegexScanMatches,
+    ScanMatches,
+    SearchResult,
+    TokenIndex,
+    field_texts,
+    fold,
+    strip_accents,
+)
+from .settings import (
+    FUZZY_MAX_DISTANCE,
+    IMPORT_BATCH_SIZE,
+    JOURNAL_COMPACT_AFTER,
+    LAZY_LOAD,
+    SEARCH_FOLD,
+    SEARCH_TIME_BUDGET,
+    SHARD_PARTITION,
+    SHARDS,
+    STORAGE,
+)
+from .sharded_storage import ShardedRecordStore
+from .sqlite_storage import SQLiteRecordStore
+from .storage import (
+    Journal,
+    LazyRecordMap,
+    atomic_write,
+    dump_json_object,
+    file_fingerprint,
+    iter_json_object,
+)
+from .validators import (
+    EMAIL_PATTERN,
+    PHONE_PATTERN,
+    parse_date,
+    parse_dates,
+    validate_addresses,
+    validate_emails,
+    validate_phones,
+)
 import os
 
+# search terms of words only are looked up in the search index, other terms are matched as substrings
+WORDS_TERM = re.compile(r"[\w\s]+")
+# prefix of search terms which are regular expressions
+REGEX_PREFIX = "re:"
+
 
 class Field:
     """
-    Base class for all fields
+    Base class for all fields. Fields use __slots__ to keep records small in memory
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         self.value = value
 
@@ -31,16 +81,27 @@ class Birthday(Field):
     Class representing a birthday field
     """
 
+    __slots__ = ("__value",)
+
     @property
     def value(self):
         return self.__value
 
     @value.setter
     def value(self, new_value: str):
-        try:
-            self.__value = datetime.strptime(new_value, "%d.%m.%Y")
-        except ValueError:
-            self.__value = None
+        self.__value = parse_date(new_value)
+
+    @classmethod
+    def from_values(cls, values: list[str]):
+        """
+        Create birthdays from many values parsed in one batch
+        """
+        birthdays = []
+        for parsed in parse_dates(values):
+            birthday = cls.__new__(cls)
+            birthday.__value = parsed
+            birthdays.append(birthday)
+        return birthdays
 
     def is_valid(self):
         """
@@ -70,7 +131,7 @@ class Birthday(Field):
 
 
 class Name(Field):
-    pass
+    __slots__ = ("value",)
 
 
 class Phone(Field):
@@ -78,6 +139,8 @@ class Phone(Field):
     Class representing a phone field
     """
 
+    __slots__ = ("__value",)
+
     @property
     def value(self):
         return self.__value
@@ -87,11 +150,23 @@ class Phone(Field):
         """
         Setter for phone number checking if it's valid 10-digits number
         """
-        if re.search(r"^[0-9]{10}$", new_value) and len(new_value) == 10:
+        if PHONE_PATTERN.fullmatch(new_value):
             self.__value = new_value
         else:
             self.__value = None
 
+    @classmethod
+    def from_values(cls, values: list[str]):
+        """
+        Create phones from many values validated in one batch
+        """
+        phones = []
+        for value, is_valid in zip(values, validate_phones(values)):
+            phone = cls.__new__(cls)
+            phone.__value = value if is_valid else None
+            phones.append(phone)
+        return phones
+
     def is_valid(self):
         return bool(self.__value)
 
@@ -101,6 +176,8 @@ class Email(Field):
     Class representing an email field
     """
 
+    __slots__ = ("__value",)
+
     @property
     def value(self):
         return self.__value
@@ -110,11 +187,23 @@ class Email(Field):
         """
         Setter for email checking if it's valid email via regex
         """
-        if re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", new_value):
+        if EMAIL_PATTERN.fullmatch(new_value):
             self.__value = new_value
         else:
             self.__value = None
 
+    @classmethod
+    def from_values(cls, values: list[str]):
+        """
+        Create emails from many values validated in one batch
+        """
+        emails = []
+        for value, is_valid in zip(values, validate_emails(values)):
+            email = cls.__new__(cls)
+            email.__value = value if is_valid else None
+            emails.append(email)
+        return emails
+
     def is_valid(self):
         return bool(self.__value)
 
@@ -124,6 +213,8 @@ class Address(Field):
     Class representing an address field
     """
 
+    __slots__ = ("__value",)
+
     @property
     def value(self):
         return self.__value
@@ -138,6 +229,18 @@ class Address(Field):
         else:
             self.__value = None
 
+    @classmethod
+    def from_values(cls, values: list[str]):
+        """
+        Create addresses from many values validated in one batch
+        """
+        addresses = []
+        for value, is_valid in zip(values, validate_addresses(values)):
+            address = cls.__new__(cls)
+            address.__value = value if is_valid else None
+            addresses.append(address)
+        return addresses
+
     def is_valid(self):
         return bool(self.__value)
 
@@ -147,6 +250,8 @@ class Record:
     Class representing a record in the address book
     """
 
+    __slots__ = ("name", "birthday", "phones", "emails", "addresses")
+
     def __init__(self, name: str):
         self.name = Name(name)
         self.birthday = None
@@ -329,6 +434,48 @@ class Record:
             "addresses": [address.to_dict() for address in self.addresses],
         }
 
+    @classmethod
+    def from_dict(cls, record_data: dict):
+        """
+        Convert dictionary to record by converting all fields to Field objects
+        """
+        record = cls(record_data["name"])
+        if len(record_data["birthday"]) > 0:
+            record.birthday = Birthday(record_data["birthday"])
+        record.phones = Phone.from_values(record_data["phones"])
+        record.addresses = Address.from_values(record_data["addresses"])
+        record.emails = Email.from_values(record_data["emails"])
+        return record
+
+
+def build_records(batch: list[dict]):
+    """
+    Build records from record dictionaries, every field of the whole batch is validated in one call.
+    Invalid values and records without a name are dropped. Return records and number of dropped values
+    """
+    valid = [record_data for record_data in batch if record_data["name"]]
+    rejected = len(batch) - len(valid)
+    records = [Record(record_data["name"]) for record_data in valid]
+    for field, field_class in (("phones", Phone), ("emails", Email), ("addresses", Address)):
+        # create fields of all records in one call and give each record its part back
+        values = iter(field_class.from_values([value for record_data in valid for value in record_data[field]]))
+        for record, record_data in zip(records, valid):
+            kept = [value for value in islice(values, len(record_data[field])) if value.is_valid()]
+            rejected += len(record_data[field]) - len(kept)
+            setattr(record, field, kept)
+    birthdays = Birthday.from_values([record_data["birthday"] for record_data in valid])
+    for record, record_data, birthday in zip(records, valid, birthdays):
+        if birthday.is_valid():
+            record.birthday = birthday
+        elif record_data["birthday"]:
+            rejected += 1
+    return records, rejected
+
+
+def greeting_filename(filename: str):
+    """Return name of the file keeping today's birthdays of the address book file."""
+    return filename + ".greeting"
+
 
 class AddressBook(UserDict):
     """
@@ -337,36 +484,209 @@ class AddressBook(UserDict):
 
     def __init__(self):
         self.data = {}
+        self.version = 0
+        self._saved_version = 0
+        self.journal = None
+        self._observers = []
+        self._token_index = None
+        self._folded_index = None
+        self._name_tree = None
+        self._birthday_index = None
+        self._birthday_calendar = None
+
+    @property
+    def dirty(self):
+        """
+        True if the address book was changed since it was loaded or saved
+        """
+        return self.version != self._saved_version
+
+    def subscribe(self, observer):
+        """
+        Call observer(name, record) after every change of a record. Record is None when it was deleted
+        """
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer):
+        """
+        Stop calling an observer added by subscribe
+        """
+        self._observers.remove(observer)
+
+    def mark_changed(self, name: str):
+        """
+        Register a change of the record with given name made outside of the address book methods
+        """
+        self._changed(name)
+
+    def _changed(self, name: str):
+        self.version += 1
+        record = self.data.get(name)
+        if self._token_index is not None:
+            self._token_index.update(name, record)
+        if self._folded_index is not None:
+            self._folded_index.update(name, record)
+        if self._birthday_index is not None:
+            self._birthday_index.update(name, record)
+        if self._name_tree is not None:
+            if record is None:
+                self._name_tree.remove(name)
+            else:
+                self._name_tree.add(name)
+        for observer in self._observers:
+            observer(name, record)
+
+    def attach_journal(self, journal: Journal):
+        """
+        Replay changes from the journal and append every next change to it
+        """
+        entries = journal.replay()
+        for entry in entries:
+            if entry["op"] == "set":
+                self.data[entry["name"]] = Record.from_dict(entry["record"])
+            elif entry["op"] == "delete":
+                self.data.pop(entry["name"], None)
+        journal.open(entries)
+        self.journal = journal
+        self.subscribe(self._write_journal)
+
+    def _write_journal(self, name: str, record: Record):
+        if record is None:
+            self.journal.append({"op": "delete", "name": name})
+        else:
+            self.journal.append({"op": "set", "name": name, "record": record.to_dict()})
+
+    def __setitem__(self, name: str, record: Record):
+        self.data[name] = record
+        self._changed(name)
+
+    def __delitem__(self, name: str):
+        del self.data[name]
+        self._changed(name)
 
     def find(self, name: str):
         """
         Find record by name. Return message if found.
         """
-        for key, value in filter(lambda el: name == el[0], self.items()):
-            return f"Found record with name: '{key}'. \nResult: {str(value)}"
+        if name in self.data:
+            return f"Found record with name: '{name}'. \nResult: {str(self.data[name])}"
+
+    def suggest_names(self, name: str, limit: int = 3):
+        """
+        Return names of contacts differing from the name by at most FUZZY_MAX_DISTANCE typos, closest first.
+        The BK-tree of names is made when a name is first not found; added and deleted contacts
+        are put into it or marked as removed, so it's not rebuilt for every lookup
+        """
+        if self._name_tree is None:
+            self._name_tree = NameTree(self.keys())
+        return self._name_tree.closest(name, FUZZY_MAX_DISTANCE, limit)
+
+    def search_index(self, folded: bool = False):
+        """
+        Return inverted index of record tokens answering word searches, queries and who.
+        With folded=True it's a separate index of folded tokens which also keeps folded field texts
+        for case- and accent-insensitive search. The first search builds it from all records,
+        afterwards _changed reindexes only the changed record
+        """
+        if folded:
+            if self._folded_index is None:
+                self._folded_index = TokenIndex.build(self.items(), folded=True)
+            return self._folded_index
+        if self._token_index is None:
+            self._token_index = TokenIndex.build(self.items())
+        return self._token_index
+
+    def find_all(
+        self,
+        term: str,
+        limit: int = None,
+        offset: int = 0,
+        folded: bool = SEARCH_FOLD,
+        unlocked=nullcontext,
+    ):
+        """
+        Find all records containing term in any field. Return SearchResult with record found by name
+        and records matched in other fields, limit and offset select the page of the latter.
+        Words of the term are looked up in the search index as token prefixes, other terms are
+        searched as substrings of fields. Terms starting with "re:" are regular expressions.
+        Fields are checked record by record only until the page is filled or SEARCH_TIME_BUDGET runs out.
+        Regular expressions are matched in a worker process which is stopped when the budget runs out,
+        unlocked() is entered while waiting for it, e.g. to let the background flusher save.
+        With folded=True case and accents are ignored: the term is compared with folded tokens and
+        field texts which the folded index keeps for every record.
+        Terms with field predicates or AND, OR, NOT operators are evaluated as queries (see query module).
+        """
+        if term.startswith(REGEX_PREFIX):
+            pattern = term[len(REGEX_PREFIX) :]
+            if folded:
+                pattern, flags = strip_accents(pattern), re.IGNORECASE
+            else:
+                flags = 0
+            matches = RegexScanMatches(
+                self._field_texts(folded), pattern, flags, SEARCH_TIME_BUDGET, unlocked
+            )
+            return SearchResult(term, self.data, None, matches, limit, offset, by_name=False)
+        if is_query(term):
+            index = self.search_index(folded)
+            matches = IndexMatches(parse(term, folded).evaluate(index), [])
+            return SearchResult(term, self.data, None, matches, limit, offset, by_name=False)
+        if folded:
+            index = self.search_index(folded=True)
+            folded_term = fold(term)
+            # name tokens include words of names, only the whole name is a name match
+            names = [
+                key
+                for key in index.lookup("name", folded_term, prefix=False)
+                if index.field_texts(key)["name"] == folded_term
+            ]
+            name_match = min(names) if names else None
+        else:
+            name_match = term if term in self.data else None
+        if WORDS_TERM.fullmatch(term):
+            matches = self.search_index(folded).search(term)
+            matches.discard(name_match)
+        else:
+            substring = fold(term) if folded else term
+            matches = ScanMatches(
+                self._field_texts(folded, exclude=name_match),
+                lambda text: substring in text,
+                SEARCH_TIME_BUDGET,
+            )
+        return SearchResult(term, self.data, name_match, matches, limit, offset)
 
-    def find_all(self, term: str):
+    def _field_texts(self, folded: bool, exclude=None):
         """
-        Find all records containing term in any field. Return message if found.
+        Yield (key, dictionary field -> text) pairs of records, with folded=True folded texts from the folded index
         """
-        res = ""
-        res1 = self.find(term)
-        if not res1:
-            res1 = "\nNot found in names"
+        # keys are copied, a regex search lets other threads run while it waits for its worker
+        keys = list(self.keys())
+        if folded:
+            index = self.search_index(folded=True)
+            for key in keys:
+                if key != exclude:
+                    yield key, index.field_texts(key)
         else:
-            res1 = "\n" + res1
-        for value in filter(
-            lambda el: re.search(term, str(el))
-            and not re.search(str(el), res)
-            and not re.search(str(el), res1),
-            self.values(),
-        ):
-            res = res + f"{str(value)}\n"
-        if res:
-            res = "\n-=Found in other fields=-\n" + res
+            for key in keys:
+                if key != exclude:
+                    yield key, field_texts(self[key])
+
+    def find_by_phone(self, number: str):
+        """
+        Find contacts by phone number or its beginning. Non-digit characters of the number are ignored.
+        Return message with matching phones and their owners.
+        A database storage answers from its phone index without reading records
+        """
+        prefix = "".join(char for char in number if char.isdigit())
+        if not prefix:
+            return f"Invalid phone number: {number}"
+        if hasattr(self.data, "phone_prefix_items"):
+            items = self.data.phone_prefix_items(prefix)
         else:
-            res = "\nNothing found in fields\n"
-        return res1 + res
+            items = self.search_index().prefix_items("phone", prefix)
+        lines = [f"{phone}: {', '.join(sorted(names))}" for phone, names in items]
+        if not lines:
+            return f"No contacts with phone starting with {prefix}"
+        return "\n".join(lines)
 
     def add_contact(self, record: Record, override=False):
         """
@@ -383,6 +703,7 @@ class AddressBook(UserDict):
             self.data[record.name.value] = record
         else:
             self.data[record.name.value] = record
+        self._changed(record.name.value)
         return record
 
     def change_contact(self, name: str, old_phone: str, new_phone: str):
@@ -391,6 +712,8 @@ class AddressBook(UserDict):
         """
         if name in self.data:
             is_changed, message = self.data[name].edit_phone(old_phone, new_phone)
+            if is_changed:
+                self._changed(name)
             return message
         else:
             return f"Contact {name} not found. Add it first to the contact book"
@@ -405,6 +728,7 @@ class AddressBook(UserDict):
             self.data[record.name.value] = record
         else:
             self.data[record.name.value] = record
+        self._changed(record.name.value)
         return record
 
     def show_birthday(self, name: str):
@@ -418,41 +742,89 @@ class AddressBook(UserDict):
         else:
             return f"Birthday data for Record with name {name} is not provided"
 
-    def get_next_week_birthdays(self):
+    def birthday_index(self):
         """
-        Get all birthdays for the next week via helper function.
+        Return index of contact names by birthday month and day. Birthday commands and the greeting
+        build it once; a changed record only moves its name to the bucket of its new birthday
         """
-        result = [
-            {"name": key, "birthday": value.birthday.value}
-            for key, value in self.items()
-            if value and value.birthday
-        ]
+        if self._birthday_index is None:
+            self._birthday_index = BirthdayIndex.build(self.items())
+        return self._birthday_index
 
-        return get_birthdays_per_week(result)
+    def birthday_calendar(self):
+        """
+        Return calendar of upcoming birthdays. It's computed once a day and after birthdays change
+        """
+        if self._birthday_calendar is None:
+            self._birthday_calendar = BirthdayCalendar(self.birthday_index())
+        return self._birthday_calendar
 
-    def get_birthdays_for_amount_days(self, days: int):
+    def get_next_week_birthdays(self):
         """
-        Get all birthdays for the next amount of days via helper function.
+        Get all birthdays for the next week from the birthday calendar.
         """
-        result = [
-            {"name": key, "birthday": value.birthday.value}
-            for key, value in self.items()
-            if value and value.birthday
-        ]
+        return self.birthday_calendar().next_week()
 
-        return get_birthdays_in_next_days(result, days)
+    def get_birthdays_for_amount_days(self, days: int):
+        """
+        Get all birthdays for the next amount of days from the birthday calendar.
+        """
+        return self.birthday_calendar().next_days(days)
 
     def check_today_birthdays(self):
         """
-        Get all birthdays for today via helper function.
+        Get all birthdays for today from the birthday calendar.
+        """
+        return self.birthday_calendar().today()
+
+    def today_greeting(self, filename: str = "address_book.json", today: date = None):
+        """
+        Get birthdays for today of the address book saved to the file.
+        Names are kept in a file next to it for the date and the saved book,
+        so the birthday index isn't built on start when neither of them changed
         """
-        result = [
-            {"name": key, "birthday": value.birthday.value}
-            for key, value in self.items()
-            if value and value.birthday
-        ]
+        today = today or date.today()
+        if self._birthday_index is None and not self.dirty:
+            names = self._load_greeting(filename, today)
+            if names is not None:
+                return format_today(names)
+        names = self._today_names(today)
+        if not self.dirty:
+            self._save_greeting(filename, today, names)
+        return format_today(names)
 
-        return get_today_birthday(result)
+    def storage_fingerprint(self, filename: str = "address_book.json"):
+        """
+        Return fingerprint of the files keeping saved records of the address book, it changes when they're written
+        """
+        if hasattr(self.data, "fingerprint"):
+            return self.data.fingerprint()
+        if self.journal is None:
+            return file_fingerprint(filename)
+        # the journal is rewritten with the same entries on start, only its size tells what was appended
+        journal_fingerprint = file_fingerprint(self.journal.path)
+        return [file_fingerprint(filename), journal_fingerprint and journal_fingerprint[0]]
+
+    def _today_names(self, today: date):
+        return [name for _greeted, name in self.birthday_index().upcoming(today, 1)]
+
+    def _load_greeting(self, filename: str, today: date):
+        try:
+            with open(greeting_filename(filename), "r", encoding="utf-8") as file:
+                greeting = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if greeting.get("date") != today.isoformat() or greeting.get("book") != self.storage_fingerprint(filename):
+            return None
+        return greeting.get("names")
+
+    def _save_greeting(self, filename: str, today: date, names: list):
+        with atomic_write(greeting_filename(filename)) as file:
+            json.dump(
+                {"date": today.isoformat(), "book": self.storage_fingerprint(filename), "names": names},
+                file,
+                ensure_ascii=False,
+            )
 
     def add_email(self, name: str, email: str):
         """
@@ -460,6 +832,8 @@ class AddressBook(UserDict):
         """
         if name in self.data:
             is_valid, message = self.data[name].add_email(email)
+            if is_valid:
+                self._changed(name)
             return message
         else:
             return f"Contact {name} not found. Add it first to the contact book"
@@ -470,6 +844,8 @@ class AddressBook(UserDict):
         """
         if name in self.data:
             is_changed, message = self.data[name].edit_email(old_email, new_email)
+            if is_changed:
+                self._changed(name)
             return message
         else:
             return f"Contact {name} not found. Add it first to the contact book"
@@ -489,6 +865,8 @@ class AddressBook(UserDict):
         """
         if name in self.data:
             is_valid, message = self.data[name].add_address(address)
+            if is_valid:
+                self._changed(name)
             return message
         else:
             return f"Contact {name} not found. Add it first to the contact book"
@@ -499,6 +877,8 @@ class AddressBook(UserDict):
         """
         if name in self.data:
             is_changed, message = self.data[name].edit_address(old_address, new_address)
+            if is_changed:
+                self._changed(name)
             return message
         else:
             return f"Contact {name} not found. Add it first to the contact book"
@@ -516,60 +896,195 @@ class AddressBook(UserDict):
         """
         Delete contact from the address book.
         """
-        del self.data[name]
+        del self[name]
 
     def generate_random_data(self):
         """
         Generate random data for the address book for testing purposes via Faker library
         """
         fake = Faker()
-        for _i in range(0, 10):
-            name = fake.first_name()
-            phone_number = fake.numerify("##########")
-            birthday = fake.date_object().strftime("%d.%m.%Y")
-
+        names = [fake.first_name() for _i in range(0, 10)]
+        phones = Phone.from_values([fake.numerify("##########") for _name in names])
+        birthdays = Birthday.from_values(
+            [fake.date_object().strftime("%d.%m.%Y") for _name in names]
+        )
+        for name, phone, birthday in zip(names, phones, birthdays):
             record = Record(name)
-            record.birthday = Birthday(birthday)
-            record.phones.append(Phone(phone_number))
+            record.birthday = birthday
+            record.phones.append(phone)
+
+            self[name] = record
 
+    def import_file(self, filename: str):
+        """
+        Import contacts from CSV or JSON Lines file. Records are read and validated in batches
+        of IMPORT_BATCH_SIZE and merged into the address book by merge_contact.
+        Return number of imported records and number of dropped invalid values
+        """
+        imported = rejected = 0
+        for batch in batched(read_records(filename), IMPORT_BATCH_SIZE):
+            records, batch_rejected = build_records(batch)
+            rejected += batch_rejected
+            for record in records:
+                self.merge_contact(record)
+                imported += 1
+        return imported, rejected
+
+    def merge_contact(self, record: Record):
+        """
+        Add contact to the address book. If the contact exists, its empty birthday is filled
+        and phones, emails and addresses it doesn't have yet are added
+        """
+        name = record.name.value
+        existing = self.data.get(name)
+        if existing is None:
             self.data[name] = record
+        else:
+            if not (existing.birthday and existing.birthday.value):
+                existing.birthday = record.birthday
+            for field in ("phones", "emails", "addresses"):
+                values = getattr(existing, field)
+                known = {value.value for value in values}
+                values.extend(value for value in getattr(record, field) if value.value not in known)
+        self._changed(name)
+
+    def export_file(self, filename: str):
+        """
+        Export contacts to CSV or JSON Lines file record by record. Return number of exported records
+        """
+        return write_records(self.iter_dicts(), filename)
 
     def to_dict(self):
-        return {key: value.to_dict() for key, value in self.data.items()}
+        return dict(self.iter_dicts())
+
+    def iter_dicts(self):
+        """
+        Yield (name, record dictionary) pairs. Records which were not accessed yet are not converted to Record objects
+        """
+        if hasattr(self.data, "iter_dicts"):
+            return self.data.iter_dicts()
+        return ((key, value.to_dict()) for key, value in self.data.items())
 
     @classmethod
-    def from_dict(cls, dict_data: dict):
+    def from_dict(cls, dict_data: dict, lazy: bool = False):
         """
-        Convert dictionary to address book by converting all records to Record objects
+        Convert dictionary to address book by converting all records to Record objects.
+        If lazy is True records are converted (and their fields validated) when they are accessed for the first time
         """
-        address_book = cls()
+        address_book = cls.lazy() if lazy else cls()
         for record_name, record_data in dict_data.items():
-            record = Record(record_data["name"])
-            if len(record_data["birthday"]) > 0:
-                record.birthday = Birthday(record_data["birthday"])
-            record.phones = [Phone(phone) for phone in record_data["phones"]]
-            record.addresses = [
-                Address(address) for address in record_data["addresses"]
-            ]
-            record.emails = [Email(email) for email in record_data["emails"]]
-            address_book[record_name] = record
+            address_book._load_record(record_name, record_data)
         return address_book
 
     @classmethod
-    def load_from_file(cls, filename: str = "address_book.json"):
+    def lazy(cls):
         """
-        Load address book from file
+        Create empty address book which converts loaded records to Record objects on first access
         """
-        if os.path.exists(filename):
-            with open(filename, "r") as file:
-                data = json.load(file)
-            return cls.from_dict(data)
+        address_book = cls()
+        address_book.data = LazyRecordMap(Record.from_dict)
+        return address_book
+
+    def _load_record(self, name: str, record_data: dict):
+        if isinstance(self.data, LazyRecordMap):
+            self.data.set_raw(name, record_data)
         else:
-            return cls()
+            self.data[name] = Record.from_dict(record_data)
 
-    def save_to_file(self, filename: str = "address_book.json"):
+    @classmethod
+    def load_from_file(
+        cls,
+        filename: str = "address_book.json",
+        storage: str = STORAGE,
+        progress=None,
+        lazy: bool = LAZY_LOAD,
+    ):
+        """
+        Load address book from file. The file is parsed record by record, so memory used by
+        parsing doesn't grow with the size of the book. progress(bytes_read, total_bytes) is
+        called while reading if given. If lazy is True records are converted to Record objects on first access.
+        In "journal" storage changes saved in the journal are replayed.
+        In "sqlite" storage records are kept in a database next to the file and read on first access,
+        in "binary" storage - in a memory-mapped snapshot next to the file,
+        in "sharded" storage - in shard files which are read on first access
+        """
+        if storage == "sqlite":
+            return cls.open_sqlite(filename, progress)
+        if storage == "binary":
+            return cls.open_binary(filename, progress)
+        if storage == "sharded":
+            return cls.open_sharded(filename, progress)
+        address_book = cls.lazy() if lazy else cls()
+        if os.path.exists(filename):
+            with open(filename, "rb") as file:
+                for record_name, record_data in iter_json_object(file, progress):
+                    address_book._load_record(record_name, record_data)
+        if storage == "journal":
+            address_book.attach_journal(Journal(filename, JOURNAL_COMPACT_AFTER))
+        return address_book
+
+    @classmethod
+    def open_sqlite(cls, filename: str = "address_book.json", progress=None):
+        """
+        Open address book stored in SQLite database named after the file.
+        Records from the JSON file are imported when the database is created
         """
-        Save address book to file
+        db_filename = os.path.splitext(filename)[0] + ".db"
+        is_new = not os.path.exists(db_filename)
+        store = SQLiteRecordStore(db_filename, Record.from_dict)
+        if is_new and os.path.exists(filename):
+            with open(filename, "rb") as file:
+                store.import_items(iter_json_object(file, progress))
+        address_book = cls()
+        address_book.data = store
+        address_book.subscribe(store.record_changed)
+        return address_book
+
+    @classmethod
+    def open_binary(cls, filename: str = "address_book.json", progress=None):
+        """
+        Open address book stored in binary snapshot named after the file.
+        Records from the JSON file are converted when the snapshot doesn't exist yet
+        """
+        snapshot_filename = os.path.splitext(filename)[0] + ".bin"
+        if not os.path.exists(snapshot_filename) and os.path.exists(filename):
+            snapshot_from_json(filename, snapshot_filename, progress)
+        address_book = cls()
+        address_book.data = BinarySnapshotStore(snapshot_filename, Record.from_dict)
+        return address_book
+
+    @classmethod
+    def open_sharded(cls, filename: str = "address_book.json", progress=None):
+        """
+        Open address book stored in a directory of shard files named after the file.
+        Records from the JSON file are distributed into shards when the directory doesn't exist yet
+        """
+        directory = os.path.splitext(filename)[0] + ".shards"
+        is_new = not os.path.exists(directory)
+        store = ShardedRecordStore(directory, Record.from_dict, SHARDS, SHARD_PARTITION)
+        if is_new and os.path.exists(filename):
+            store.import_file(filename, progress)
+        address_book = cls()
+        address_book.data = store
+        address_book.subscribe(store.record_changed)
+        return address_book
+
+    def save_to_file(self, filename: str = "address_book.json"):
         """
-        with open(filename, "w") as file:
-            json.dump(self.to_dict(), file)
+        Save address book to file. The file is replaced atomically.
+        With a journal attached the file is only rewritten when the journal grows long
+        """
+        version = self.version
+        if hasattr(self.data, "save"):
+            # records are kept in a storage which saves itself
+            self.data.save()
+        elif self.journal is None or self.journal.needs_compaction:
+            with atomic_write(filename) as file:
+                dump_json_object(self.iter_dicts(), file)
+            if self.journal is not None:
+                self.journal.reset()
+        self._saved_version = version
+        if self._birthday_index is not None and not self.dirty:
+            # keep the greeting of the next start valid for the saved book
+            today = date.today()
+            self._save_greeting(filename, today, self._today_names(today))
@@ -0,0 +1,289 @@
+"""
+Module providing binary snapshot storage for address book records.
+
+Snapshot layout (all numbers little-endian):
+    header      magic b"CBAB", format version, reserved, number of records
+    table       one fixed-size entry per record sorted by UTF-8 encoded name:
+                name offset, name length, record offset, record length
+    blobs       names and encoded records
+
+Encoded record: birthday as date ordinal (0 if not set), then phones, emails
+and addresses, each as a count followed by length-prefixed UTF-8 strings.
+"""
+
+from collections.abc import MutableMapping
+from datetime import date
+import mmap
+import os
+import struct
+import sys
+from .storage import atomic_write, dump_json_object, file_fingerprint, iter_json_object
+from .validators import parse_date
+
+MAGIC = b"CBAB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+ENTRY = struct.Struct("<QIQI")
+COUNT = struct.Struct("<H")
+LENGTH = struct.Struct("<I")
+ORDINAL = struct.Struct("<I")
+LIST_FIELDS = ("phones", "emails", "addresses")
+
+
+def encode_record(record_data: dict):
+    """
+    Encode record dictionary (as in Record.to_dict) to bytes
+    """
+    birthday = parse_date(record_data["birthday"])
+    ordinal = birthday.toordinal() if birthday is not None else 0
+    parts = [ORDINAL.pack(ordinal)]
+    for field in LIST_FIELDS:
+        values = record_data[field]
+        parts.append(COUNT.pack(len(values)))
+        for value in values:
+            encoded = value.encode("utf-8")
+            parts.append(LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+    return b"".join(parts)
+
+
+def decode_record(name: str, blob):
+    """
+    Decode record dictionary from bytes written by encode_record
+    """
+    (ordinal,) = ORDINAL.unpack_from(blob, 0)
+    record_data = {
+        "name": name,
+        "birthday": date.fromordinal(ordinal).strftime("%d.%m.%Y") if ordinal else "",
+    }
+    pos = ORDINAL.size
+    for field in LIST_FIELDS:
+        (count,) = COUNT.unpack_from(blob, pos)
+        pos += COUNT.size
+        values = []
+        for _i in range(count):
+            (length,) = LENGTH.unpack_from(blob, pos)
+            pos += LENGTH.size
+            values.append(str(blob[pos : pos + length], "utf-8"))
+            pos += length
+        record_data[field] = values
+    return record_data
+
+
+def write_snapshot(items, filename: str):
+    """
+    Write snapshot from (name, encoded record) pairs. The file is replaced atomically
+    """
+    items = sorted((name.encode("utf-8"), blob) for name, blob in items)
+    table_end = HEADER.size + ENTRY.size * len(items)
+    with atomic_write(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(items)))
+        offset = table_end
+        for name, blob in items:
+            file.write(ENTRY.pack(offset, len(name), offset + len(name), len(blob)))
+            offset += len(name) + len(blob)
+        for name, blob in items:
+            file.write(name)
+            file.write(blob)
+
+
+class BinarySnapshotStore(MutableMapping):
+    """
+    Mapping of contact name to Record backed by a memory-mapped binary snapshot.
+    Opening reads only the header; a record is decoded when it's accessed.
+    Accessed and changed records are kept in memory and written by save()
+    """
+
+    def __init__(self, filename: str, record_factory):
+        """
+        record_factory converts a record dictionary (as in Record.to_dict) to a Record
+        """
+        self.filename = filename
+        self.record_factory = record_factory
+        self._records = {}
+        self._deleted = set()
+        self._added = set()
+        self._file = None
+        self._map = None
+        self._count = 0
+        self._open()
+
+    def _open(self):
+        if not os.path.exists(self.filename):
+            return
+        self._file = open(self.filename, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _reserved, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.filename} is not an address book snapshot")
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    def _entry(self, index: int):
+        return ENTRY.unpack_from(self._map, HEADER.size + ENTRY.size * index)
+
+    def _name_bytes(self, index: int):
+        name_offset, name_length, _offset, _length = self._entry(index)
+        return self._map[name_offset : name_offset + name_length]
+
+    def _name(self, index: int):
+        return str(self._name_bytes(index), "utf-8")
+
+    def _blob(self, index: int):
+        _name_offset, _name_length, offset, length = self._entry(index)
+        return self._map[offset : offset + length]
+
+    def _decode(self, index: int, name: str):
+        _name_offset, _name_length, offset, length = self._entry(index)
+        with memoryview(self._map) as view:
+            return decode_record(name, view[offset : offset + length])
+
+    def _find(self, name: str):
+        """
+        Binary search of the name in the snapshot table. Return entry index or -1
+        """
+        key = name.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._name_bytes(low) == key:
+            return low
+        return -1
+
+    def __getitem__(self, name: str):
+        if name in self._records:
+            return self._records[name]
+        if name in self._deleted:
+            raise KeyError(name)
+        index = self._find(name)
+        if index < 0:
+            raise KeyError(name)
+        record = self.record_factory(self._decode(index, name))
+        self._records[name] = record
+        return record
+
+    def __setitem__(self, name: str, record):
+        if name in self._deleted:
+            self._deleted.discard(name)
+        elif name not in self:
+            self._added.add(name)
+        self._records[name] = record
+
+    def __delitem__(self, name: str):
+        if name not in self:
+            raise KeyError(name)
+        self._records.pop(name, None)
+        if name in self._added:
+            self._added.discard(name)
+        else:
+            self._deleted.add(name)
+
+    def __contains__(self, name):
+        if name in self._records:
+            return True
+        return name not in self._deleted and self._find(name) >= 0
+
+    def __iter__(self):
+        for index in range(self._count):
+            name = self._name(index)
+            if name not in self._deleted:
+                yield name
+        yield from list(self._added)
+
+    def __len__(self):
+        return self._count - len(self._deleted) + len(self._added)
+
+    def save(self):
+        """
+        Write a new snapshot. Records which were not accessed are copied without decoding
+        """
+        items = []
+        for index in range(self._count):
+            name = self._name(index)
+            if name in self._deleted or name in self._records:
+                continue
+            items.append((name, self._blob(index)))
+        for name, record in self._records.items():
+            items.append((name, encode_record(record.to_dict())))
+        self._close()
+        try:
+            write_snapshot(items, self.filename)
+            self._deleted.clear()
+            self._added.clear()
+        finally:
+            # the old snapshot is still in place if the write failed
+            self._open()
+
+    def fingerprint(self):
+        """
+        Return fingerprint of the snapshot file, it changes whenever a snapshot is written
+        """
+        return file_fingerprint(self.filename)
+
+    def iter_dicts(self):
+        """
+        Yield (name, record dictionary) pairs without creating Record objects
+        for records which were not accessed
+        """
+        for index in range(self._count):
+            name = self._name(index)
+            if name in self._records:
+                yield name, self._records[name].to_dict()
+            elif name not in self._deleted:
+                yield name, self._decode(index, name)
+        for name in list(self._added):
+            yield name, self._records[name].to_dict()
+
+    def close(self):
+        self._close()
+
+
+def snapshot_from_json(json_filename: str, filename: str, progress=None):
+    """
+    Convert address book JSON file to a binary snapshot
+    """
+    with open(json_filename, "rb") as file:
+        write_snapshot(
+            (
+                (name, encode_record(record_data))
+                for name, record_data in iter_json_object(file, progress)
+            ),
+            filename,
+        )
+
+
+def snapshot_to_json(filename: str, json_filename: str):
+    """
+    Convert binary snapshot to address book JSON file
+    """
+    store = BinarySnapshotStore(filename, dict)
+    try:
+        with atomic_write(json_filename) as file:
+            dump_json_object(store.iter_dicts(), file)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    # python -m console_bot.binary_storage to-binary address_book.json address_book.bin
+    # python -m console_bot.binary_storage to-json address_book.bin address_book.json
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print("Usage: to-binary|to-json SOURCE DESTINATION")
+        sys.exit(1)
+    if sys.argv[1] == "to-binary":
+        snapshot_from_json(sys.argv[2], sys.argv[3])
+    else:
+        snapshot_to_json(sys.argv[2], sys.argv[3])
@@ -0,0 +1,171 @@
+"""Module providing calendar index of contact birthdays"""
+
+from array import array
+from datetime import date, timedelta
+
+
+def greeting_date(birthday_date: date):
+    """
+    Return date when a birthday falling on the date is greeted: weekend birthdays are greeted next Monday
+    """
+    if birthday_date.weekday() in (5, 6):
+        return birthday_date + timedelta(days=7 - birthday_date.weekday())
+    return birthday_date
+
+
+def same_day_next_year(day: date):
+    """
+    Return the same day next year, 1 March for 29 February
+    """
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        return date(day.year + 1, 3, 1)
+
+
+def is_leap(year: int):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def next_greeting(month: int, day: int, today: date):
+    """
+    Return date when a birthday on the month and day is greeted next time from today:
+    this year if it didn't pass yet, otherwise next year.
+    29 February falls on 1 March in non-leap years, weekend birthdays are greeted next Monday
+    """
+    for year in (today.year, today.year + 1):
+        try:
+            birthday_date = date(year, month, day)
+        except ValueError:
+            birthday_date = date(year, 3, 1)
+        if birthday_date >= today:
+            return greeting_date(birthday_date)
+
+
+class BirthdayIndex:
+    """
+    Names of contacts by (month, day) of their birthday, 366 buckets at most.
+    A window of days is answered by visiting the buckets of days inside the window,
+    so it costs O(days + hits) rather than O(contacts).
+    Birthdays are also kept as compact arrays of months and days with a name per slot
+    for vectorized computation (see birthday_vector module); free slots have month 0
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._slots = {}
+        self._free = []
+        self.names = []
+        self.months = array("B")
+        self.days = array("B")
+        # incremented when any birthday changes
+        self.version = 0
+
+    @classmethod
+    def build(cls, items):
+        """
+        Build index from (name, record) pairs
+        """
+        index = cls()
+        for name, record in items:
+            index.update(name, record)
+        return index
+
+    @classmethod
+    def from_users(cls, users: list):
+        """
+        Build index from dictionaries with "name" and "birthday" date
+        """
+        index = cls()
+        for user in users:
+            index.set(user["name"], user["birthday"])
+        return index
+
+    def update(self, name: str, record):
+        """
+        Reindex birthday of the contact with given name. Record is None if it was deleted
+        """
+        if record is not None and record.birthday and record.birthday.value:
+            self.set(name, record.birthday.value)
+        else:
+            self.set(name, None)
+
+    def set(self, name: str, birthday):
+        """
+        Set birthday date of the contact with given name, None removes it
+        """
+        day = (birthday.month, birthday.day) if birthday is not None else None
+        slot = self._slots.get(name)
+        old = (self.months[slot], self.days[slot]) if slot is not None else None
+        if old == day:
+            return
+        self.version += 1
+        if old is not None:
+            names = self._buckets[old]
+            names.discard(name)
+            if not names:
+                del self._buckets[old]
+            if day is None:
+                del self._slots[name]
+                self.names[slot] = None
+                self.months[slot] = self.days[slot] = 0
+                self._free.append(slot)
+        if day is not None:
+            self._buckets.setdefault(day, set()).add(name)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                    self.names[slot] = name
+                else:
+                    slot = len(self.names)
+                    self.names.append(name)
+                    self.months.append(0)
+                    self.days.append(0)
+                self._slots[name] = slot
+            self.months[slot], self.days[slot] = day
+
+    def born_on(self, day: date):
+        """
+        Return names of contacts whose birthday falls on the date;
+        in non-leap years birthdays of 29 February fall on 1 March
+        """
+        names = self._buckets.get((day.month, day.day), set())
+        if day.month == 3 and day.day == 1 and not is_leap(day.year):
+            names = names | self._buckets.get((2, 29), set())
+        return names
+
+    def upcoming(self, today: date, days: int):
+        """
+        Return (greeting date, name) pairs sorted by date for birthdays greeted in less than days days from today.
+        Birthdays which already passed this year are taken in the next year
+        """
+        end = same_day_next_year(today)
+        hits = []
+        day = today
+        # 29 February birthdays were taken on 29 February or 1 March of a non-leap year
+        leap_day_taken = False
+        while day < end and (day - today).days < days:
+            names = self.born_on(day)
+            if day.month == 2 and day.day == 29:
+                if leap_day_taken:
+                    names = ()
+                leap_day_taken = True
+            elif day.month == 3 and day.day == 1 and not is_leap(day.year):
+                leap_day_taken = True
+            self._extend(hits, today, day, days, names)
+            day += timedelta(days=1)
+        if day == end and not leap_day_taken:
+            # walk from 1 March of a leap year ends before 29 February birthdays fall on 1 March
+            self._extend(hits, today, day, days, self.born_on(day) - self.born_on(today))
+        hits.sort()
+        return hits
+
+    @staticmethod
+    def _extend(hits: list, today: date, day: date, days: int, names):
+        if names:
+            greeted = greeting_date(day)
+            if (greeted - today).days < days:
+                hits.extend((greeted, name) for name in sorted(names))
+
+    def __len__(self):
+        return len(self._slots)
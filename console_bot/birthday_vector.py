@@ -0,0 +1,43 @@
+"""
+Module providing vectorized computation of upcoming birthdays with NumPy.
+NumPy is optional: when it isn't installed `available` is False and birthdays are
+computed by the pure Python path of BirthdayIndex
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is not installed
+    np = None
+
+available = np is not None
+
+
+def upcoming(index, today):
+    """
+    Return (offsets, dates, names) arrays for every birthday in the index sorted by greeting date and name:
+    number of days from today to the greeting date, the date and the name.
+    Birthdays which already passed this year are taken in the next year, 29 February falls on
+    1 March in non-leap years and weekend birthdays are greeted next Monday
+    """
+    months = np.frombuffer(index.months, dtype=np.uint8).astype(np.int64)
+    days = np.frombuffer(index.days, dtype=np.uint8).astype(np.int64)
+    used = months > 0
+    months, days = months[used], days[used]
+    names = np.array(index.names, dtype=object)[used]
+
+    def occurrence(year: int):
+        # day after 28 February of a non-leap year is 1 March, so 29 February becomes 1 March
+        month_starts = np.datetime64(f"{year:04d}-01", "M") + (months - 1)
+        return month_starts.astype("datetime64[D]") + (days - 1)
+
+    start = np.datetime64(today, "D")
+    dates = occurrence(today.year)
+    dates = np.where(dates < start, occurrence(today.year + 1), dates)
+    # 1970-01-01 was Thursday, weekday 0 is Monday
+    weekdays = (dates.astype(np.int64) + 3) % 7
+    dates = dates + np.where(weekdays >= 5, 7 - weekdays, 0)
+    offsets = (dates - start).astype(np.int64)
+    # stable sort by offset of names sorted before gives order by offset and name
+    by_name = np.argsort(names, kind="stable")
+    order = by_name[np.argsort(offsets[by_name], kind="stable")]
+    return offsets[order], dates[order].astype(object), names[order]
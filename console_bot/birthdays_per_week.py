@@ -1,97 +1,130 @@
-from datetime import datetime, timedelta
-from collections import defaultdict
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import groupby
+from . import birthday_vector
+from .birthday_index import BirthdayIndex
+from .settings import VECTORIZE_BIRTHDAYS
 
 
-# Print users for `users` list that have birthday next week
-# - print users birthdays for the next week starting from current date
-# - users that have birthday on weekend need to be greeted the next Monday
-# - week starts from Monday
-def get_birthdays_per_week(users: list):
+class BirthdayCalendar:
     """
-    Print users for `users` list that have birthday next week
+    Birthdays greeted during a year from today sorted by greeting date.
+    Users that have birthday on weekend are greeted the next Monday.
+    The list is computed once per calendar day and again only after birthdays change,
+    any window of days is a slice of it found by binary search.
+    With vectorized=True and NumPy installed the list is computed with array operations
+    over all birthdays, otherwise by visiting the birthday index day by day
     """
-    current_date = datetime.today().date()
-    result = defaultdict(list)
-    for user in users:
-        user_name = user["name"]
-        user_birthday = user["birthday"].date()
-        birthday_this_year = prepare_birthday_date(current_date, user_birthday)
-        delta_days = (birthday_this_year - current_date).days
-        # Check if birthday falls in the next week
-        if delta_days < 7:
-            update_result(result, user_name, birthday_this_year)
-    if not result:
-        return "No birthdays next week"
-    return "\n".join([f"{date}: {(',').join(people)}" for date, people in result.items()])
 
+    def __init__(self, index: BirthdayIndex, vectorized: bool = VECTORIZE_BIRTHDAYS):
+        self.index = index
+        self.vectorized = vectorized and birthday_vector.available
+        self._key = None
+        # numbers of days from today to greeting dates, greeting dates and names greeted on them,
+        # sorted by date and name
+        self._offsets = []
+        self._dates = []
+        self._names = []
 
-# Print users for 'users' list that have birthdays in the next number of days
-def get_birthdays_in_next_days(users: list, days: int):
+    def _upcoming(self, today: date):
+        key = (today, self.index.version)
+        if key != self._key:
+            if self.vectorized:
+                self._offsets, self._dates, self._names = birthday_vector.upcoming(
+                    self.index, today
+                )
+            else:
+                # greeting dates of all birthdays are less than a year and 2 weekend days ahead
+                hits = self.index.upcoming(today, 368)
+                self._offsets = [(greeting - today).days for greeting, _name in hits]
+                self._dates = [greeting for greeting, _name in hits]
+                self._names = [name for _greeting, name in hits]
+            self._key = key
+
+    def window(self, days: int, start: int = 0, today: date = None):
+        """
+        Return (greeting date, name) pairs sorted by date and name
+        greeted from start to start + days days from today
+        """
+        today = today or date.today()
+        self._upcoming(today)
+        low = bisect_left(self._offsets, start)
+        high = bisect_left(self._offsets, start + days, low)
+        return list(zip(self._dates[low:high], self._names[low:high]))
+
+    def next_week(self, today: date = None):
+        """
+        Print users that have birthday next week by weekday
+        """
+        return format_birthdays(self.window(7, today=today), "%A", "No birthdays next week")
+
+    def next_days(self, days: int, today: date = None):
+        """
+        Print users that have birthdays in the next number of days by date
+        """
+        return format_birthdays(
+            self.window(int(days), today=today), "%d %B", f"No birthdays in next {days} days"
+        )
+
+    def today(self, today: date = None):
+        """
+        Print users that have birthday today
+        """
+        return format_today([name for _date, name in self.window(1, today=today)])
+
+
+def format_birthdays(hits: list, date_format: str, empty: str):
     """
-    Print users for 'users' list that have birthdays in the next number of days
+    Format (greeting date, name) pairs sorted by date as lines 'date: names', formatting every date once
     """
-    current_date = datetime.today().date()
-    result = defaultdict(list)
-    for user in users:
-        user_name = user["name"]
-        user_birthday = user["birthday"].date()
-        birthday_this_year = prepare_birthday_date(current_date, user_birthday)
-        delta_days = (birthday_this_year - current_date).days
-        if delta_days < int(days):
-            result_dates(result, user_name, birthday_this_year)
-    if not result:
-        return f"No birthdays in next {days} days"
-    return "\n".join([f"{date}: {(',').join(people)}" for date, people in result.items()])
+    if not hits:
+        return empty
+    return "\n".join(
+        f"{day.strftime(date_format)}: {','.join(name for _day, name in day_hits)}"
+        for day, day_hits in groupby(hits, key=lambda hit: hit[0])
+    )
 
 
-def get_today_birthday(users: list):
+def format_today(names: list):
     """
-    Print users for `users` list that have birthday today
+    Format names greeted today as a reminder to congratulate them
     """
-    current_date = datetime.today().date()
-    result = defaultdict(list)
-    for user in users:
-        user_name = user["name"]
-        user_birthday = user["birthday"].date()
-        birthday_this_year = prepare_birthday_date(current_date, user_birthday)
-        if birthday_this_year == current_date:
-            result['Today'].append(user_name)
-    if not result:
+    if not names:
         return 'Today there is no birthdays'
-    return '\n'.join([f"Don't forget to congratulate: {', '.join(people)}" for people in result.values()])
+    return f"Don't forget to congratulate: {', '.join(names)}"
+
+
+def users_calendar(users: list):
+    """
+    Birthday calendar of `users` list of dictionaries with "name" and "birthday"
+    """
+    return BirthdayCalendar(BirthdayIndex.from_users(users))
 
 
-def result_dates(result: defaultdict, user_name: str, birthday_this_year: datetime):
+# Print users for `users` list that have birthday next week
+# - print users birthdays for the next week starting from current date
+# - users that have birthday on weekend need to be greeted the next Monday
+# - week starts from Monday
+def get_birthdays_per_week(users: list):
     """
-    Update result dictionary with username and birthday date in format 'day month'
+    Print users for `users` list that have birthday next week
     """
-    day_date = birthday_this_year.strftime('%d %B')
-    result[day_date].append(user_name)
+    return users_calendar(users).next_week()
 
 
-def update_result(result: defaultdict, user_name: str, birthday_this_year: datetime):
+# Print users for 'users' list that have birthdays in the next number of days
+def get_birthdays_in_next_days(users: list, days: int):
     """
-    Update result dictionary with username and birthday date in format 'day month'
+    Print users for 'users' list that have birthdays in the next number of days
     """
-    day_string = birthday_this_year.strftime('%A')
-    result[day_string].append(user_name)
+    return users_calendar(users).next_days(days)
 
 
-def prepare_birthday_date(current_date: datetime.date, user_birthday: datetime.date):
+def get_today_birthday(users: list):
     """
-    Prepare birthday date for the current year and adjust for weekends
+    Print users for `users` list that have birthday today
     """
-    try:
-        birthday_this_year = user_birthday.replace(year=current_date.year)
-    except ValueError:  # For February 29th on non-leap years
-        birthday_this_year = user_birthday.replace(year=current_date.year, day=user_birthday.day - 1) + timedelta(
-            days=1)
-    if birthday_this_year < current_date:
-        birthday_this_year = birthday_this_year.replace(year=current_date.year + 1)
-    # Adjust for weekends
-    if birthday_this_year.weekday() in [5, 6]:
-        birthday_this_year += timedelta(days=7 - birthday_this_year.weekday())
-    return birthday_this_year
+    return users_calendar(users).today()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""Module providing streaming import and export of contacts in CSV and JSON Lines files"""
+
+import csv
+import itertools
+import json
+import os
+from .storage import atomic_write
+
+CSV_FIELDS = ["name", "phones", "emails", "addresses", "birthday"]
+LIST_FIELDS = ("phones", "emails", "addresses")
+# separator of several values in one CSV cell
+VALUE_SEPARATOR = ";"
+
+
+def file_format(filename: str):
+    """
+    Return "csv" or "jsonl" depending on the file extension
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def normalize(record_data: dict):
+    """
+    Convert record read from a file to a record dictionary (as in Record.to_dict)
+    """
+    normalized = {
+        "name": str(record_data.get("name") or "").strip(),
+        "birthday": str(record_data.get("birthday") or "").strip(),
+    }
+    for field in LIST_FIELDS:
+        values = record_data.get(field) or []
+        if isinstance(values, str):
+            values = values.split(VALUE_SEPARATOR)
+        normalized[field] = [str(value).strip() for value in values if str(value).strip()]
+    return normalized
+
+
+def read_records(filename: str):
+    """
+    Yield record dictionaries from CSV or JSON Lines file one at a time.
+    CSV file needs a header with some of columns: name, phones, emails, addresses, birthday;
+    several phones, emails or addresses in one cell are separated by ';'
+    """
+    fmt = file_format(filename)
+    with open(filename, "r", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            for row in csv.DictReader(file):
+                yield normalize(row)
+        else:
+            for line in file:
+                if line.strip():
+                    yield normalize(json.loads(line))
+
+
+def write_records(items, filename: str):
+    """
+    Write (name, record dictionary) pairs to CSV or JSON Lines file one at a time.
+    Return number of written records
+    """
+    fmt = file_format(filename)
+    count = 0
+    with atomic_write(filename) as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+        for _name, record_data in items:
+            if fmt == "csv":
+                row = dict(record_data)
+                for field in LIST_FIELDS:
+                    row[field] = VALUE_SEPARATOR.join(record_data[field])
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(record_data, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def batched(iterable, size: int):
+    """
+    Split iterable into lists of given size
+    """
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
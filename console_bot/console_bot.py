@@ -1,20 +1,26 @@
 """Module providing a function printing bot messages."""
 
+import asyncio
+from contextlib import suppress
 from prompt_toolkit import PromptSession
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.history import InMemoryHistory
+from prompt_toolkit.patch_stdout import patch_stdout
 from prompt_toolkit.styles import Style
 from .input_manager import InputManager
-from .address_book import AddressBook
 from .edit import edit_record
 from .message_manager import print_help_message, print_welcome_message
 from .logo import print_ascii_art, logo
+from .reminders import ReminderScheduler
+from .settings import FLUSH_INTERVAL, REMINDERS
+from .storage import WriteBehindFlusher
 
 commands = [
     "hello",
     "add",
     "change",
     "phone",
+    "who",
     "search",
     "add-email",
     "change-email",
@@ -30,6 +36,7 @@ commands = [
     "birthdays-for"
     "add-note",
     "find-notes",
+    "top-notes",
     "find-notes-by-tag",
     "delete-note",
     "change-note",
@@ -37,6 +44,8 @@ commands = [
     "close",
     "exit",
     "random-book",
+    "import",
+    "export",
     "random-note",
     "edit",
     "about-us",
@@ -58,92 +67,139 @@ def main():
 
     print_ascii_art(logo)
     print_welcome_message("Welcome to the assistant bot!")
-    print(AddressBook().check_today_birthdays())
+    print(input_manager.today_greeting())
     print(input_manager.random_note(save=False))
 
-    while True:
-        try:
-            user_input = session.prompt("Enter a command: ", style=style)
-            command, *args = input_manager.parse_input(user_input)
-        except KeyboardInterrupt:
-            print("Ctrl-C pressed. Try again.")
-            continue
-
-        if command in ["close", "exit"]:
-            print("Good bye!")
-            input_manager.save_to_json()
-            break
-        elif command == "hello":
-            print("How can I help you?")
-        elif command == "add":
-            print(input_manager.add_contact(args))
-        elif command == "change":
-            print(input_manager.change_contact(args))
-        elif command == "phone":
-            print(input_manager.get_contact_phone(args))
-        elif command == "search":
-            print(input_manager.full_search(args))
-        elif command == "add-email":
-            print(input_manager.add_contact_email(args))
-        elif command == "change-email":
-            print(input_manager.change_contact_email(args))
-        elif command == "email":
-            print(input_manager.get_contact_email(args))
-        elif command == "add-address":
-            print(input_manager.add_contact_address(args))
-        elif command == "change-address":
-            new_address = input("Enter new address: ")
-            print(input_manager.change_contact_address(args, new_address))
-        elif command == "address":
-            print(input_manager.get_contact_address(args))
-        elif command == "all":
-            print(input_manager.get_all_contacts())
-        elif command == "help":
-            print_help_message()
-        elif command == "add-birthday":
-            print(input_manager.add_birthday(args))
-        elif command == "show-birthday":
-            print(input_manager.show_birthday(args))
-        elif command == "birthdays":
-            print(input_manager.get_next_week_birthdays())
-        elif command == "birthdays-for":
-            print(input_manager.get_birthdays_for_amount_days(args))
-        elif command == "random-book":
-            print(input_manager.generate_random_book())
-        elif command == "add-note":
-            note = input("Enter your note: ")
-            tags = input(
-                "Enter your tags (separated by commas, Example: 'work,todo,assignment'): "
-            )
-            print(input_manager.add_note(note, tags))
-        elif command == "find-notes":
-            keyword = input("Enter searching keyword: ")
-            print(input_manager.find_notes(keyword))
-        elif command == "find-notes-by-tag":
-            tag = input("Enter searching tag: ")
-            print(input_manager.find_notes_by_tag(tag))
-        elif command == "delete-note":
-            index = input("Enter index of note you want to remove (eg. 1 for first): ")
-            print(input_manager.delete_note(index))
-        elif command == "change-note":
-            change_note(input_manager)
-        elif command == "all-notes":
-            print(input_manager.all_notes())
-        elif command == "random-note":
-            print(input_manager.random_note())
-        elif command == "edit":
-            edit_record(input_manager, args)
-        elif command == "about-us":
-            print_ascii_art(logo)
-        else:
-            print("Invalid command.")
-        input_manager.save_to_json()
-
-
-def change_note(input_manager):
-    position = input("Enter index of note you want to change (eg. 1 for first): ")
-    new_note = input("Enter a new note or 'skip' if you don't want to change name: ")
-    new_tags = input(
+    flusher = WriteBehindFlusher(input_manager.save_to_json, FLUSH_INTERVAL).start()
+    input_manager.unlocked = flusher.unlocked
+    try:
+        asyncio.run(read_commands(input_manager, session, flusher))
+    finally:
+        # changes made since the last flush are saved even if the bot crashed
+        flusher.stop()
+
+
+async def read_commands(input_manager, session, flusher):
+    """Execute commands until exit while birthday reminders are printed above the prompt"""
+
+    async def ask(message):
+        # changes are flushed while the bot waits for an answer
+        with flusher.unlocked():
+            return await session.prompt_async(message)
+
+    reminders = None
+    if REMINDERS:
+        scheduler = ReminderScheduler(input_manager.book, print)
+        reminders = asyncio.create_task(scheduler.run(flusher.lock))
+    try:
+        with patch_stdout():
+            while True:
+                try:
+                    user_input = await session.prompt_async("Enter a command: ", style=style)
+                    command, *args = input_manager.parse_input(user_input)
+                    with flusher.lock:
+                        keep_running = await handle_command(input_manager, command, args, ask)
+                except KeyboardInterrupt:
+                    print("Ctrl-C pressed. Try again.")
+                    continue
+                except EOFError:
+                    # Ctrl-D exits like the exit command
+                    print("Good bye!")
+                    break
+                if not keep_running:
+                    break
+    finally:
+        if reminders is not None:
+            reminders.cancel()
+            with suppress(asyncio.CancelledError):
+                await reminders
+
+
+async def handle_command(input_manager, command, args, ask):
+    """Execute a single command, ask(message) awaits an answer of the user. Return False when the bot should exit"""
+    if command in ["close", "exit"]:
+        print("Good bye!")
+        return False
+    elif command == "hello":
+        print("How can I help you?")
+    elif command == "add":
+        print(input_manager.add_contact(args))
+    elif command == "change":
+        print(input_manager.change_contact(args))
+    elif command == "phone":
+        print(input_manager.get_contact_phone(args))
+    elif command == "who":
+        print(input_manager.find_by_phone(args))
+    elif command == "search":
+        print(input_manager.full_search(args))
+    elif command == "add-email":
+        print(input_manager.add_contact_email(args))
+    elif command == "change-email":
+        print(input_manager.change_contact_email(args))
+    elif command == "email":
+        print(input_manager.get_contact_email(args))
+    elif command == "add-address":
+        print(input_manager.add_contact_address(args))
+    elif command == "change-address":
+        new_address = await ask("Enter new address: ")
+        print(input_manager.change_contact_address(args, new_address))
+    elif command == "address":
+        print(input_manager.get_contact_address(args))
+    elif command == "all":
+        print(input_manager.get_all_contacts())
+    elif command == "help":
+        print_help_message()
+    elif command == "add-birthday":
+        print(input_manager.add_birthday(args))
+    elif command == "show-birthday":
+        print(input_manager.show_birthday(args))
+    elif command == "birthdays":
+        print(input_manager.get_next_week_birthdays())
+    elif command == "birthdays-for":
+        print(input_manager.get_birthdays_for_amount_days(args))
+    elif command == "random-book":
+        print(input_manager.generate_random_book())
+    elif command == "import":
+        print(input_manager.import_contacts(args))
+    elif command == "export":
+        print(input_manager.export_contacts(args))
+    elif command == "add-note":
+        note = await ask("Enter your note: ")
+        tags = await ask(
+            "Enter your tags (separated by commas, Example: 'work,todo,assignment'): "
+        )
+        print(input_manager.add_note(note, tags))
+    elif command == "find-notes":
+        keyword = await ask("Enter searching keyword: ")
+        print(input_manager.find_notes(keyword))
+    elif command == "top-notes":
+        query = await ask("Enter searching keywords: ")
+        print(input_manager.top_notes(query, args))
+    elif command == "find-notes-by-tag":
+        tag = await ask("Enter searching tag: ")
+        print(input_manager.find_notes_by_tag(tag))
+    elif command == "delete-note":
+        index = await ask("Enter index of note you want to remove (eg. 1 for first): ")
+        print(input_manager.delete_note(index))
+    elif command == "change-note":
+        await change_note(input_manager, ask)
+    elif command == "all-notes":
+        print(input_manager.all_notes())
+    elif command == "random-note":
+        print(input_manager.random_note())
+    elif command == "edit":
+        await edit_record(input_manager, ask, args)
+    elif command == "about-us":
+        print_ascii_art(logo)
+    else:
+        print("Invalid command.")
+    return True
+
+
+async def change_note(input_manager, ask):
+    position = await ask("Enter index of note you want to change (eg. 1 for first): ")
+    new_note = await ask("Enter a new note or 'skip' if you don't want to change name: ")
+    new_tags = await ask(
         "Enter new tags (separated by commas, Example: 'work,todo,assignment') or 'skip' if you don't want to change tags: "
     )
     skip_mode = ""
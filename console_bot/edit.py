@@ -1,11 +1,11 @@
 from .input_manager import InputManager
 
 
-def get_index(field, len):
+async def get_index(ask, field, len):
     """
     Function to get index from user
     """
-    index = input(f"Enter a index of {field}(eg. 1 for first): ")
+    index = await ask(f"Enter a index of {field}(eg. 1 for first): ")
     if index.isnumeric():
         index = int(index)
     else:
@@ -16,7 +16,7 @@ def get_index(field, len):
     return index
 
 
-def edit_field(input_manager, args, field, get_func, put_func):
+async def edit_field(input_manager, ask, args, field, get_func, put_func):
     """
     Function to update/delete phone/email/address
     """
@@ -29,10 +29,10 @@ def edit_field(input_manager, args, field, get_func, put_func):
     print(get_func(args))
     if not getattr(record, fields):
         return None  # continue
-    index = get_index(field, len(getattr(record, fields)))
+    index = await get_index(ask, field, len(getattr(record, fields)))
     if not index:
         return None  # continue
-    nvalue = input(f"Enter new {field} or enter 'delete': ")
+    nvalue = await ask(f"Enter new {field} or enter 'delete': ")
     if nvalue == "delete":
         input_manager.delete_field(name, field, index - 1)
         print(f"{field} has been deleted")
@@ -43,7 +43,7 @@ def edit_field(input_manager, args, field, get_func, put_func):
             print(put_func([name, str(getattr(record, fields)[index - 1]), nvalue])) 
 
 
-def edit_record(input_manager, args):
+async def edit_record(input_manager, ask, args):
     """
     Function to handle update/delete phone/email/address from user input
     """
@@ -53,8 +53,8 @@ def edit_record(input_manager, args):
     field = args[0]
     args.pop(0)
 
-    if not input_manager.get_contact_phone(args):
-        print(f"{args[0]} not found")
+    if args[0] not in input_manager.book:
+        print(input_manager.name_not_found(args[0]))
         return None  # continue
 
     if field == "phone":
@@ -73,4 +73,4 @@ def edit_record(input_manager, args):
         print("not supported field")
         return None  # continue
     
-    edit_field(input_manager, args, field, get_func, put_func)
\ No newline at end of file
+    await edit_field(input_manager, ask, args, field, get_func, put_func)
\ No newline at end of file
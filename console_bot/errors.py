@@ -1,3 +1,6 @@
+from .search_index import PatternError
+
+
 def input_error(func):
     # FIXME: message here are too specific
     def inner(*args, **kwargs):
@@ -6,6 +9,8 @@ def input_error(func):
         """
         try:
             return func(*args, **kwargs)
+        except PatternError as error:
+            return str(error)
         except ValueError:
             return "Invalid input. Please provide valid arguments."
         except IndexError:
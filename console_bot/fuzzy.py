@@ -0,0 +1,143 @@
+"""Module providing typo-tolerant lookup of contact names"""
+
+
+def edit_distance(first: str, second: str):
+    """
+    Return Levenshtein distance: minimal number of inserted, deleted or replaced characters
+    turning one string into the other.
+    Columns of the distance matrix are kept as bit vectors of +1/-1 differences (Myers' algorithm),
+    so a whole column is computed with a few integer operations
+    """
+    if not first:
+        return len(second)
+    mask = (1 << len(first)) - 1
+    last = 1 << (len(first) - 1)
+    positions = {}
+    for i, char in enumerate(first):
+        positions[char] = positions.get(char, 0) | (1 << i)
+    plus, minus = mask, 0
+    distance = len(first)
+    for char in second:
+        equal = positions.get(char, 0)
+        vertical = equal | minus
+        horizontal = ((((equal & plus) + plus) & mask) ^ plus) | equal
+        horizontal_plus = minus | (~(horizontal | plus) & mask)
+        horizontal_minus = plus & horizontal
+        if horizontal_plus & last:
+            distance += 1
+        elif horizontal_minus & last:
+            distance -= 1
+        horizontal_plus = ((horizontal_plus << 1) | 1) & mask
+        horizontal_minus = (horizontal_minus << 1) & mask
+        plus = horizontal_minus | (~(vertical | horizontal_plus) & mask)
+        minus = horizontal_plus & vertical
+    return distance
+
+
+def typo_distance(first: str, second: str):
+    """
+    Return edit distance counting swap of two adjacent characters as one typo
+    """
+    previous2 = None
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first_char != second_char),
+            )
+            if (
+                i > 1
+                and j > 1
+                and first_char == second[j - 2]
+                and first[i - 2] == second_char
+            ):
+                distance = min(distance, previous2[j - 2] + 1)
+            current.append(distance)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class NameTree:
+    """
+    BK-tree of contact names compared without case. Every node keeps children by their distance
+    to the node, so by the triangle inequality a search visits only children with distance
+    within max_distance of the distance between the query and the node.
+    Removed names stay in the tree as nodes but are not returned; the tree is rebuilt
+    when most of its nodes are removed
+    """
+
+    def __init__(self, names=()):
+        self._root = None
+        self._size = 0
+        # casefolded key -> names having the key
+        self._names = {}
+        for name in names:
+            self.add(name)
+
+    @staticmethod
+    def _key(name: str):
+        return name.casefold()
+
+    def add(self, name: str):
+        key = self._key(name)
+        if key in self._names:
+            self._names[key].add(name)
+            return
+        self._names[key] = {name}
+        node = self._root
+        if node is None:
+            self._root = (key, {})
+            self._size = 1
+            return
+        while True:
+            node_key, children = node
+            distance = edit_distance(key, node_key)
+            if distance == 0:
+                # the key was removed before and stays in the tree
+                return
+            if distance not in children:
+                children[distance] = (key, {})
+                self._size += 1
+                return
+            node = children[distance]
+
+    def remove(self, name: str):
+        key = self._key(name)
+        names = self._names.get(key)
+        if not names:
+            return
+        names.discard(name)
+        if not names:
+            del self._names[key]
+            if self._size > 2 * len(self._names) + 64:
+                self._rebuild()
+
+    def _rebuild(self):
+        names = [name for key_names in self._names.values() for name in key_names]
+        self.__init__(names)
+
+    def closest(self, name: str, max_distance: int, limit: int = None):
+        """
+        Return names within max_distance of the name, closest first.
+        Found names are ordered by typo_distance, so swapped letters rank before other typos
+        """
+        if self._root is None:
+            return []
+        key = self._key(name)
+        found = []
+        stack = [self._root]
+        while stack:
+            node_key, children = stack.pop()
+            distance = edit_distance(key, node_key)
+            if distance <= max_distance and node_key in self._names:
+                typos = typo_distance(key, node_key)
+                found.extend(
+                    (typos, distance, found_name) for found_name in self._names[node_key]
+                )
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return [found_name for _typos, _distance, found_name in sorted(found)[:limit]]
@@ -1,12 +1,19 @@
+from contextlib import nullcontext
+import os
 from .errors import input_error
 from .note import NoteBook, Note
 from .address_book import Record, AddressBook
+from .message_manager import file_progress
+from .settings import SEARCH_PAGE_SIZE
 
 
 class InputManager:
     def __init__(self):
-        self.book = AddressBook.load_from_file("address_book.json")
+        with file_progress("Loading contacts...", "address_book.json") as progress:
+            self.book = AddressBook.load_from_file("address_book.json", progress=progress)
         self.note_book = NoteBook.load_from_file("note_book.json")
+        # context entered while a long search waits, the bot sets it to release the flusher lock
+        self.unlocked = nullcontext
 
     @input_error
     def parse_input(self, user_input: str):
@@ -17,6 +24,16 @@ class InputManager:
         cmd = cmd.strip().lower()
         return cmd, *args
 
+    def name_not_found(self, name: str):
+        """
+        Function to build a message for a contact missing in the address book with suggested similar names.
+        """
+        message = f"Contact {name} not found"
+        suggestions = self.book.suggest_names(name)
+        if suggestions:
+            message += f". Did you mean: {', '.join(suggestions)}?"
+        return message
+
     @input_error
     def add_contact(self, args: list[str]):
         """
@@ -43,15 +60,45 @@ class InputManager:
         Function to get a phone number of a contact in the address book.
         """
         name = args[0]
+        if name not in self.book:
+            return self.name_not_found(name)
         return self.book.find(name)
 
     @input_error
-    def full_search(self, args: list[str]):
+    def find_by_phone(self, args: list[str]):
+        """
+        Function to find contacts by a phone number or its beginning.
         """
-        Function to find all contacts containing a specific term.
+        number = "".join(args)
+        if not number:
+            raise ValueError("Phone number is required")
+        return self.book.find_by_phone(number)
+
+    @input_error
+    def full_search(self, args: list[str]):
         """
-        term = args[0]
-        return self.book.find_all(term)
+        Function to find all contacts containing a specific term or matching a query.
+        Page number is given by "--page N" option, so numbers in the term are searched as they are.
+        """
+        page = 1
+        if "--page" in args:
+            args = list(args)
+            position = args.index("--page")
+            if position + 1 == len(args):
+                raise ValueError("Page number is required after --page")
+            page = int(args[position + 1])
+            del args[position : position + 2]
+        term = " ".join(args)
+        if not term:
+            raise ValueError("Search term is required")
+        if page < 1:
+            raise ValueError("Page number starts from 1")
+        return self.book.find_all(
+            term,
+            limit=SEARCH_PAGE_SIZE,
+            offset=(page - 1) * SEARCH_PAGE_SIZE,
+            unlocked=self.unlocked,
+        )
 
     def get_all_contacts(self):
         """
@@ -77,6 +124,8 @@ class InputManager:
         Function to show the birthday of a contact in the address book.
         """
         name = args[0]
+        if name not in self.book:
+            return self.name_not_found(name)
         return self.book.show_birthday(name)
 
     def get_next_week_birthdays(self):
@@ -85,6 +134,12 @@ class InputManager:
         """
         return self.book.get_next_week_birthdays()
 
+    def today_greeting(self):
+        """
+        Function to get birthdays for today to greet the user on start.
+        """
+        return self.book.today_greeting("address_book.json")
+
     def get_birthdays_for_amount_days(self, args: list[str]):
         """
         Function to get all birthdays in the next number of days and return them as a string.
@@ -114,6 +169,8 @@ class InputManager:
         Function to get an email of a contact in the address book.
         """
         name = args[0]
+        if name not in self.book:
+            return self.name_not_found(name)
         return self.book.get_email(name)
 
     @input_error
@@ -140,6 +197,8 @@ class InputManager:
         Function to get an address of a contact in the address book.
         """
         name = args[0]
+        if name not in self.book:
+            return self.name_not_found(name)
         return self.book.get_address(name)
 
     def generate_random_book(self):
@@ -149,6 +208,27 @@ class InputManager:
         self.book.generate_random_data()
         return self.get_all_contacts()
 
+    @input_error
+    def import_contacts(self, args: list[str]):
+        """
+        Function to import contacts from CSV or JSON Lines file and save the address book once.
+        """
+        filename = args[0]
+        if not os.path.exists(filename):
+            return f"File {filename} not found"
+        imported, rejected = self.book.import_file(filename)
+        self.book.save_to_file()
+        return f"Imported {imported} contacts, skipped {rejected} invalid values"
+
+    @input_error
+    def export_contacts(self, args: list[str]):
+        """
+        Function to export contacts to CSV or JSON Lines file.
+        """
+        filename = args[0]
+        exported = self.book.export_file(filename)
+        return f"Exported {exported} contacts to {filename}"
+
     @input_error
     def add_note(self, value: str, tags: str):
         """
@@ -164,6 +244,15 @@ class InputManager:
         """
         return self.note_book.find_notes(keyword)
 
+    @input_error
+    def top_notes(self, query: str, args: list[str]):
+        """
+        Function to find the most relevant notes for the query. Optional argument is the number of notes.
+        """
+        if args:
+            return self.note_book.top_notes(query, int(args[0]))
+        return self.note_book.top_notes(query)
+
     @input_error
     def find_notes_by_tag(self, tag: str):
         """
@@ -199,6 +288,7 @@ class InputManager:
             record.emails.pop(index)
         elif field == "address":
             record.addresses.pop(index)
+        self.book.mark_changed(name)
 
     def all_notes(self):
         """
@@ -212,9 +302,14 @@ class InputManager:
         """
         return self.note_book.generate_random(save)
 
-    def save_to_json(self):
+    def save_to_json(self, force=False):
         """
         Function to save the address book and notebook to JSON files.
-        """
-        self.book.save_to_file()
-        self.note_book.save_to_file()
+        Books without unsaved changes are skipped unless force is True.
+        """
+        if force or self.book.dirty:
+            self.book.save_to_file()
+        if force or self.note_book.dirty:
+            self.note_book.save_to_file()
+        else:
+            self.note_book.save_index()
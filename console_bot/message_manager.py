@@ -1,6 +1,7 @@
 """Module providing functions for displaying elements with rich library"""
 
 from contextlib import contextmanager
+import os
 import time
 from rich.console import Console
 from rich.table import Table
@@ -8,11 +9,14 @@ from rich import box
 from rich.align import Align
 from rich.live import Live
 from rich.panel import Panel
+from rich.progress import Progress
 from rich.text import Text
 
 
 console = Console()
 BEAT_TIME = 0.04
+# files smaller than this are loaded without a progress bar
+PROGRESS_MIN_SIZE = 16 * 1024 * 1024
 
 
 @contextmanager
@@ -60,8 +64,20 @@ def print_help_message():
                 ":telephone_receiver: Retrieves the phone number for the specified contact.",
             )
             table.add_row(
-                "search \[term]",
-                ":magnifying_glass_tilted_left: Global search, retrives any matches in any contact's fields.",
+                "who \[phone]",
+                ":telephone_receiver: Finds contacts by phone number or its beginning.",
+            )
+            table.add_row(
+                "search \[term] \[--page N]",
+                ":magnifying_glass_tilted_left: Global search, every word of the term matches the beginning of a word in any contact's field: 'search 050' finds phone 0501234567, 'search 4567' doesn't, use 're:4567' for that. Terms with other characters, like '@example', match anywhere. Results are shown by pages.",
+            )
+            table.add_row(
+                "search re:\[pattern] \[--page N]",
+                ":magnifying_glass_tilted_left: Searches contacts with fields matching a regular expression, also inside words (e.g. re:ohn).",
+            )
+            table.add_row(
+                "search \[query] \[--page N]",
+                ":magnifying_glass_tilted_left: Search with field predicates name:, phone:, email:, address:, birthday: and AND, OR, NOT (e.g. email:gmail.com birthday:03 name:Jo*).",
             )
         with beat(10):
             table.add_row(
@@ -97,6 +113,14 @@ def print_help_message():
                 "random-book",
                 ":counterclockwise_arrows_button: Generates random book with 10 contacts.",
             )
+            table.add_row(
+                "import \[file]",
+                ":inbox_tray: Imports contacts from .csv or .jsonl file.",
+            )
+            table.add_row(
+                "export \[file]",
+                ":outbox_tray: Exports contacts to .csv or .jsonl file.",
+            )
         with beat(10):
             table.add_row(
                 "add-birthday \[name] \[birthday]",
@@ -112,6 +136,10 @@ def print_help_message():
         with beat(10):
             table.add_row("add-note", ":spiral_notepad: Adds note to Note Book.")
             table.add_row("find-notes", ":spiral_notepad: Searches notes by keywords.")
+            table.add_row(
+                "top-notes \[count]",
+                ":spiral_notepad: Shows notes most relevant to keywords, best first.",
+            )
             table.add_row(
                 "find-notes-by-tag", ":spiral_notepad: Searches notes by tag."
             )
@@ -136,3 +164,17 @@ def print_welcome_message(message):
 
     panel = Panel(text, expand=True, style="bold blue")
     console.print(panel)
+
+
+@contextmanager
+def file_progress(description: str, filename: str):
+    """
+    Yields a progress(done, total) callback showing a progress bar while a big file is read.
+    For small or missing files the callback is None.
+    """
+    if not os.path.exists(filename) or os.path.getsize(filename) < PROGRESS_MIN_SIZE:
+        yield None
+        return
+    with Progress(console=console, transient=True) as progress:
+        task = progress.add_task(description, total=os.path.getsize(filename))
+        yield lambda done, total: progress.update(task, completed=done, total=total)
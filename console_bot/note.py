@@ -5,6 +5,9 @@ import json
 import os
 import random
 from importlib import resources
+from .note_index import RankIndex, TagIndex, TrigramIndex
+from .settings import JOURNAL_COMPACT_AFTER, SEARCH_FOLD, STORAGE, TOP_NOTES
+from .storage import Journal, atomic_write
 
 
 class Note:
@@ -27,13 +30,17 @@ class Note:
         """
         Adds a tag to the note.
         """
-        self.tags.add(tag)
+        if self.tags is None:
+            self.tags = []
+        if tag not in self.tags:
+            self.tags.append(tag)
 
     def remove_tag(self, tag: str):
         """
-        Removes a tag to the note.
+        Removes a tag from the note.
         """
-        self.tags.discard(tag)
+        if self.tags and tag in self.tags:
+            self.tags.remove(tag)
 
     def has_tag(self, partial_tag: str):
         """
@@ -42,7 +49,7 @@ class Note:
             If the note has tags ['workshop', 'homework'], calling has_tag('work') will return True.
 
         """
-        return any(partial_tag in tag for tag in self.tags)
+        return any(partial_tag in tag for tag in self.tags or ())
 
     @property
     def value(self):
@@ -61,34 +68,148 @@ class Note:
         return {"value": self.value, "tags": self.tags}
 
 
+def index_filename(filename: str, folded: bool):
+    """Return name of the trigram index file of the notebook file."""
+    return filename + (".folded" if folded else "") + ".trigrams"
+
+
 class NoteBook(UserList):
     """Class representing a notebook - list of notes"""
 
     def __init__(self):
         super().__init__()
+        self.version = 0
+        self._saved_version = 0
+        self.journal = None
+        self._observers = []
+        # trigram indexes of note values and of folded note values, by folded flag
+        self._trigram_indexes = {}
+        self._unsaved_indexes = set()
+        self._tag_index = None
+        self._rank_index = None
+
+    @property
+    def dirty(self):
+        """True if the notebook was changed since it was loaded or saved."""
+        return self.version != self._saved_version
+
+    def subscribe(self, observer):
+        """
+        Call observer(op, index, note) after every change of notes.
+        Op is one of "add", "edit" or "delete".
+        """
+        self._observers.append(observer)
+
+    def mark_changed(self, index: int):
+        """Register a change of the note at index made outside of the notebook methods."""
+        self._changed("edit", index)
+
+    def _changed(self, op: str, index: int):
+        self.version += 1
+        note = self.data[index] if op != "delete" else None
+        for folded, trigram_index in self._trigram_indexes.items():
+            trigram_index.update(op, index, note)
+            self._unsaved_indexes.add(folded)
+        if self._tag_index is not None:
+            self._tag_index.update(op, index, note)
+        if self._rank_index is not None:
+            self._rank_index.update(op, index, note)
+        for observer in self._observers:
+            observer(op, index, note)
+
+    def attach_journal(self, journal: Journal):
+        """Replay changes from the journal and append every next change to it."""
+        entries = journal.replay()
+        for entry in entries:
+            if entry["op"] == "add":
+                self.data.append(Note(entry["note"]["value"], entry["note"]["tags"]))
+            elif entry["op"] == "edit":
+                self.data[entry["index"]] = Note(
+                    entry["note"]["value"], entry["note"]["tags"]
+                )
+            elif entry["op"] == "delete":
+                del self.data[entry["index"]]
+        journal.open(entries)
+        self.journal = journal
+        self.subscribe(self._write_journal)
+
+    def _write_journal(self, op: str, index: int, note: Note):
+        entry = {"op": op, "index": index}
+        if note is not None:
+            entry["note"] = note.to_dict()
+        self.journal.append(entry)
 
     def add_note(self, note: Note):
         """Function adding note to notebook."""
         self.data.append(note)
+        self._changed("add", len(self.data) - 1)
         return "Note was added"
 
-    def find_notes(self, keyword: str):
-        """Function to find notes containing a specific keyword."""
-        found_notes = []
-        for note in self.data:
-            if keyword in note.value:
-                found_notes.append(note)
+    def trigram_index(self, folded: bool = False):
+        """
+        Return trigram index of note values, with folded=True of folded note values for
+        case- and accent-insensitive search. An index saved next to the notebook file is loaded with it
+        if it's up to date, otherwise the first find-notes builds it; after changes it's saved again.
+        """
+        if folded not in self._trigram_indexes:
+            self._trigram_indexes[folded] = TrigramIndex.build(self.data, folded)
+            self._unsaved_indexes.add(folded)
+        return self._trigram_indexes[folded]
+
+    def find_notes(self, keyword: str, folded: bool = SEARCH_FOLD):
+        """Function to find notes containing a specific keyword, ignoring case and accents with folded=True."""
+        found_notes = self.trigram_index(folded).find(keyword)
 
         return "\n".join(
             f"{index + 1}: {note}" for index, note in enumerate(found_notes)
         )
 
+    def rank_index(self):
+        """
+        Return BM25 index of note terms for top-notes. It isn't saved, the first top-notes builds it.
+        """
+        if self._rank_index is None:
+            self._rank_index = RankIndex.build(self.data)
+        return self._rank_index
+
+    def top_notes(self, query: str, k: int = TOP_NOTES):
+        """
+        Function to find k notes most relevant to the query words by BM25 score of their text and tags.
+        Notes are shown best first with their positions in the notebook.
+        """
+        return "\n".join(
+            f"{position + 1}: {note}"
+            for position, note in self.rank_index().top(query, k)
+        )
+
+    def tag_index(self):
+        """
+        Return index of note tags for finding and sorting notes by tag.
+        It isn't saved, it's built from all notes by the first command which needs it.
+        """
+        if self._tag_index is None:
+            self._tag_index = TagIndex.build(self.data)
+        return self._tag_index
+
+    def add_tag(self, index: int, tag: str):
+        """Function adding a tag to the note at a specific index."""
+        if 0 <= index < len(self.data):
+            self.data[index].add_tag(tag)
+            self._changed("edit", index)
+            return "Tag was added"
+        raise IndexError("Index out of range")
+
+    def remove_tag(self, index: int, tag: str):
+        """Function removing a tag from the note at a specific index."""
+        if 0 <= index < len(self.data):
+            self.data[index].remove_tag(tag)
+            self._changed("edit", index)
+            return "Tag was removed"
+        raise IndexError("Index out of range")
+
     def find_notes_by_tag(self, tag: str):
         """Function to find notes containing a specific tag."""
-        found_notes = []
-        for note in self.data:
-            if note.has_tag(tag):
-                found_notes.append(note)
+        found_notes = self.tag_index().find_partial(tag)
 
         return "\n".join(
             f"{index + 1}: {note}" for index, note in enumerate(found_notes)
@@ -99,7 +220,7 @@ class NoteBook(UserList):
         Sorts the notes in the notebook based on whether they contain the specified tag.
         Notes with the specified tag are ordered to appear first.
         """
-        return sorted(self.data, key=lambda note: tag in note.tags)
+        return self.tag_index().sorted_by_tag(tag)
 
     def edit_note(self, index: int, new_value: str, new_tags: str, mode):
         """Function to edit a note at a specific index."""
@@ -110,6 +231,7 @@ class NoteBook(UserList):
             if not mode == "skip_tags":
                 new_tags = new_tags.split(",")
                 self.data[index].tags = new_tags
+            self._changed("edit", index)
             return "Note was changed"
         else:
             raise IndexError("Index out of range")
@@ -118,6 +240,7 @@ class NoteBook(UserList):
         """Function to delete a note at a specific index."""
         if 0 <= index < len(self.data):
             del self.data[index]
+            self._changed("delete", index)
             return "Note was deleted"
         else:
             raise IndexError("Index out of range.")
@@ -158,20 +281,49 @@ class NoteBook(UserList):
         return note_book
 
     @classmethod
-    def load_from_file(cls, filename: str = "note_book.json"):
+    def load_from_file(cls, filename: str = "note_book.json", storage: str = STORAGE):
         """
         Load notebook from file.
+        In "journal" storage changes saved in the journal are replayed.
         """
         if os.path.exists(filename):
             with open(filename, "r", encoding="utf-8") as file:
                 data = json.load(file)
-            return cls.from_list(data)
+            note_book = cls.from_list(data)
         else:
-            return cls()
+            note_book = cls()
+        if storage == "journal":
+            note_book.attach_journal(Journal(filename, JOURNAL_COMPACT_AFTER))
+        if note_book.journal is None or not note_book.journal.entries:
+            for folded in (False, True):
+                trigram_index = TrigramIndex.load(
+                    index_filename(filename, folded), filename, note_book.data, folded
+                )
+                if trigram_index is not None:
+                    note_book._trigram_indexes[folded] = trigram_index
+        return note_book
 
     def save_to_file(self, filename: str = "note_book.json"):
         """
-        Save notebook to file.
+        Save notebook to file. The file is replaced atomically.
+        With a journal attached the file is only rewritten when the journal grows long.
+        """
+        version = self.version
+        if self.journal is None or self.journal.needs_compaction:
+            with atomic_write(filename) as file:
+                json.dump(self.to_list(), file, ensure_ascii=False)
+            if self.journal is not None:
+                self.journal.reset()
+        self._saved_version = version
+        self.save_index(filename)
+
+    def save_index(self, filename: str = "note_book.json"):
+        """
+        Save trigram indexes next to the notebook file if they were built or changed since loading,
+        so they're not rebuilt on the next start. Indexes are saved only when the file has all notes.
         """
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(self.to_list(), file, ensure_ascii=False)
+        if self.dirty or (self.journal is not None and self.journal.entries):
+            return
+        for folded in sorted(self._unsaved_indexes):
+            self._trigram_indexes[folded].save(index_filename(filename, folded), filename)
+        self._unsaved_indexes.clear()
@@ -0,0 +1,346 @@
+"""Module providing indexes of notebook notes by text, by tags and for ranked search"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import heapq
+import json
+import math
+import os
+import sys
+from .search_index import fold, words
+from .storage import atomic_write, file_fingerprint
+
+# version of saved trigram indexes, increased when indexed texts change, e.g. when folding changes
+INDEX_VERSION = 2
+
+
+def trigrams(text: str):
+    """
+    Return set of all substrings of length 3 of the text
+    """
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NoteIndex:
+    """
+    Base of indexes of notebook notes. Notes get ids in notebook order and ids of notes at positions are kept
+    in `ids`, so sorted ids of found notes give them in notebook order. Subclasses index a note in _index
+    and remove it in _unindex
+    """
+
+    def __init__(self):
+        self.ids = []
+        self._next_id = 0
+        self._notes = {}
+
+    @classmethod
+    def build(cls, notes, *args):
+        """
+        Build index of notes in notebook order, args are passed to the index constructor
+        """
+        index = cls(*args)
+        for note in notes:
+            index.add(note)
+        return index
+
+    def add(self, note):
+        """
+        Index note appended to the end of the notebook
+        """
+        note_id = self._next_id
+        self._next_id += 1
+        self.ids.append(note_id)
+        self._notes[note_id] = note
+        self._index(note_id, note)
+
+    def edit(self, position: int, note):
+        """
+        Reindex note at position after it was changed
+        """
+        note_id = self.ids[position]
+        self._unindex(note_id)
+        self._notes[note_id] = note
+        self._index(note_id, note)
+
+    def delete(self, position: int):
+        """
+        Remove note at position from the index
+        """
+        note_id = self.ids.pop(position)
+        self._unindex(note_id)
+        del self._notes[note_id]
+
+    def update(self, op: str, position: int, note):
+        """
+        Notebook observer keeping the index up to date
+        """
+        if op == "add":
+            self.add(note)
+        elif op == "edit":
+            self.edit(position, note)
+        elif op == "delete":
+            self.delete(position)
+
+    def _index(self, note_id: int, note):
+        raise NotImplementedError
+
+    def _unindex(self, note_id: int):
+        raise NotImplementedError
+
+
+class TrigramIndex(NoteIndex):
+    """
+    Index from trigrams of note values to note ids. A note contains a keyword only if it contains
+    all trigrams of the keyword, so candidates are found by intersecting posting sets and then verified.
+    Folded index keeps folded note values, computed when a note changes, for case- and accent-insensitive search
+    """
+
+    def __init__(self, folded: bool = False):
+        super().__init__()
+        self.folded = folded
+        # indexed text of every note: its value, folded in folded index
+        self._texts = {}
+        # trigram -> set of note ids, None for posting lists not yet decoded from the saved index
+        self._postings = {}
+        self._table = {}
+        self._stored = None
+
+    def _text(self, note):
+        return fold(note.value) if self.folded else note.value
+
+    def _index(self, note_id: int, note):
+        text = self._text(note)
+        self._texts[note_id] = text
+        for trigram in trigrams(text):
+            self._posting(trigram, create=True).add(note_id)
+
+    def _unindex(self, note_id: int):
+        for trigram in trigrams(self._texts.pop(note_id)):
+            note_ids = self._posting(trigram)
+            note_ids.discard(note_id)
+            if not note_ids:
+                del self._postings[trigram]
+
+    def _posting(self, trigram: str, create: bool = False):
+        """
+        Return set of ids of notes containing trigram, decoding it from the saved index if needed
+        """
+        note_ids = self._postings.get(trigram)
+        if note_ids is None:
+            if trigram in self._postings:
+                offset, count = self._table[trigram]
+                note_ids = set(self._stored[offset : offset + count])
+            elif create:
+                note_ids = set()
+            else:
+                return set()
+            self._postings[trigram] = note_ids
+        return note_ids
+
+    def find(self, keyword: str):
+        """
+        Return notes containing keyword in notebook order
+        """
+        if self.folded:
+            keyword = fold(keyword)
+        if len(keyword) < 3:
+            candidates = self._notes.keys()
+        else:
+            posting_sets = sorted(
+                (self._posting(trigram) for trigram in trigrams(keyword)), key=len
+            )
+            candidates = set(posting_sets[0]).intersection(*posting_sets[1:])
+        return [
+            self._notes[note_id]
+            for note_id in sorted(candidates)
+            if keyword in self._texts[note_id]
+        ]
+
+    def save(self, filename: str, notebook_filename: str):
+        """
+        Save index to file: a JSON header line with the index version, the notebook file fingerprint and
+        a table trigram -> (offset, count) followed by posting lists of note positions as 32-bit integers.
+        The index is valid only for the notebook file in its current state
+        """
+        positions = {note_id: position for position, note_id in enumerate(self.ids)}
+        table = {}
+        postings = array("I")
+        for trigram in self._postings:
+            note_positions = sorted(positions[note_id] for note_id in self._posting(trigram))
+            table[trigram] = [len(postings), len(note_positions)]
+            postings.extend(note_positions)
+        if sys.byteorder != "little":
+            postings.byteswap()
+        header = {
+            "version": INDEX_VERSION,
+            "notebook": file_fingerprint(notebook_filename),
+            "notes": len(self.ids),
+            "table": table,
+        }
+        with atomic_write(filename, "wb") as file:
+            file.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+            file.write(postings.tobytes())
+
+    @classmethod
+    def load(
+        cls, filename: str, notebook_filename: str, notes: list, folded: bool = False
+    ):
+        """
+        Load index saved for the notebook file. Posting lists are decoded when they are used.
+        Return None if there is no index or it's outdated
+        """
+        if not os.path.exists(filename):
+            return None
+        with open(filename, "rb") as file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return None
+            if (
+                header.get("version") != INDEX_VERSION
+                or header.get("notebook") != file_fingerprint(notebook_filename)
+                or header.get("notes") != len(notes)
+            ):
+                return None
+            stored = array("I")
+            stored.frombytes(file.read())
+        if sys.byteorder != "little":
+            stored.byteswap()
+        index = cls(folded)
+        index.ids = list(range(len(notes)))
+        index._next_id = len(notes)
+        index._notes = dict(enumerate(notes))
+        index._texts = {
+            note_id: index._text(note) for note_id, note in index._notes.items()
+        }
+        index._postings = dict.fromkeys(header["table"])
+        index._table = header["table"]
+        index._stored = stored
+        return index
+
+
+class TagIndex(NoteIndex):
+    """
+    Index from note tags to note ids. Partial tags are matched against the distinct tags only,
+    which are far fewer than notes
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tags = {}
+        self._postings = {}
+
+    def _index(self, note_id: int, note):
+        tags = frozenset(note.tags or ())
+        self._tags[note_id] = tags
+        for tag in tags:
+            self._postings.setdefault(tag, set()).add(note_id)
+
+    def _unindex(self, note_id: int):
+        for tag in self._tags.pop(note_id):
+            note_ids = self._postings[tag]
+            note_ids.discard(note_id)
+            if not note_ids:
+                del self._postings[tag]
+
+    def _sorted_notes(self, note_ids):
+        return [self._notes[note_id] for note_id in sorted(note_ids)]
+
+    def find(self, tag: str):
+        """
+        Return notes having the tag in notebook order
+        """
+        return self._sorted_notes(self._postings.get(tag, ()))
+
+    def find_partial(self, partial_tag: str):
+        """
+        Return notes having a tag which contains partial_tag in notebook order
+        """
+        note_ids = set()
+        for tag, tag_note_ids in self._postings.items():
+            if partial_tag in tag:
+                note_ids.update(tag_note_ids)
+        return self._sorted_notes(note_ids)
+
+    def sorted_by_tag(self, tag: str):
+        """
+        Return all notes in notebook order, notes having the tag first
+        """
+        tagged = self._postings.get(tag, set())
+        return self._sorted_notes(tagged) + [
+            self._notes[note_id] for note_id in self.ids if note_id not in tagged
+        ]
+
+
+def note_terms(note):
+    """
+    Return list of casefolded words of the note value and tags
+    """
+    text = " ".join([note.value, *(note.tags or ())])
+    return words(text.casefold())
+
+
+class RankIndex(NoteIndex):
+    """
+    Index of note terms for ranking notes by BM25 relevance to a query.
+    Postings keep the frequency of a term in every note containing it, so a query scores only those notes
+    and the number of postings is the document frequency. Note lengths and their total are kept for
+    length normalization. Best notes are shown with positions found by binary search in `ids`
+    """
+
+    # BM25 term frequency saturation and document length normalization
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        super().__init__()
+        # terms of every note as they were indexed, notes can be changed in place
+        self._terms = {}
+        self._lengths = {}
+        self._total_length = 0
+        # term -> dictionary note id -> term frequency, its length is document frequency of the term
+        self._postings = {}
+
+    def _index(self, note_id: int, note):
+        terms = Counter(note_terms(note))
+        self._terms[note_id] = tuple(terms)
+        self._lengths[note_id] = sum(terms.values())
+        self._total_length += self._lengths[note_id]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[note_id] = frequency
+
+    def _unindex(self, note_id: int):
+        self._total_length -= self._lengths.pop(note_id)
+        for term in self._terms.pop(note_id):
+            postings = self._postings[term]
+            del postings[note_id]
+            if not postings:
+                del self._postings[term]
+
+    def top(self, query: str, k: int):
+        """
+        Return up to k (position, note) pairs of notes most relevant to the query, best first
+        """
+        count = len(self._notes)
+        if not count:
+            return []
+        average_length = self._total_length / count or 1
+        scores = {}
+        for term in set(words(query.casefold())):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for note_id, frequency in postings.items():
+                norm = self.K1 * (
+                    1 - self.B + self.B * self._lengths[note_id] / average_length
+                )
+                scores[note_id] = scores.get(note_id, 0.0) + idf * frequency * (
+                    self.K1 + 1
+                ) / (frequency + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            (bisect_left(self.ids, note_id), self._notes[note_id])
+            for note_id, _score in best
+        ]
@@ -0,0 +1,226 @@
+"""
+Module providing field-scoped search queries over the address book search index.
+
+Query syntax:
+    name:Jo*            contacts with a name word starting with "Jo"
+    email:gmail.com     contacts with email, its user or domain equal to "gmail.com"
+    birthday:03         contacts born in March (birthday:15.03 - on 15 March, birthday:1990 - in 1990)
+    Kyiv                contacts with any field word starting with "Kyiv"
+    a b, a AND b        both match
+    a OR b              any matches
+    NOT a               doesn't match
+    ( ... )             grouping
+
+Predicates are evaluated with the search index. In AND the predicate matching the fewest contacts
+is looked up first; the others are intersected with it or, when they match more contacts than
+there are candidates left, checked only for the candidates.
+"""
+
+import calendar
+import re
+from .search_index import FIELDS, fold
+
+OPERATORS = ("AND", "OR", "NOT")
+QUERY_TOKEN = re.compile(r"[()]|[^\s()]+")
+FIELD_PREDICATE = re.compile(rf"^(?:{'|'.join(FIELDS)}):", re.IGNORECASE)
+
+
+def is_query(term: str):
+    """
+    Return True if the term uses field predicates or AND, OR, NOT operators
+    """
+    return any(
+        FIELD_PREDICATE.match(token) or token in OPERATORS
+        for token in QUERY_TOKEN.findall(term)
+    )
+
+
+class Predicate:
+    """
+    Contacts having a token equal to the value (or starting with it if prefix is True)
+    in one of the fields
+    """
+
+    def __init__(self, fields, value: str, prefix: bool):
+        self.fields = fields
+        self.value = value
+        self.prefix = prefix
+
+    def estimate(self, index):
+        return sum(
+            index.count(field, self.value, self.prefix) for field in self.fields
+        )
+
+    def evaluate(self, index):
+        keys = set()
+        for field in self.fields:
+            keys |= index.lookup(field, self.value, self.prefix)
+        return keys
+
+    def matches(self, index, key: str):
+        return any(
+            index.has_token(key, field, self.value, self.prefix)
+            for field in self.fields
+        )
+
+    def restrict(self, index, candidates: set):
+        if self.estimate(index) <= len(candidates):
+            return candidates & self.evaluate(index)
+        return {key for key in candidates if self.matches(index, key)}
+
+
+class Not:
+    """
+    Contacts not matching the query
+    """
+
+    def __init__(self, query):
+        self.query = query
+
+    def estimate(self, index):
+        return len(index) - self.query.estimate(index)
+
+    def evaluate(self, index):
+        return set(index.keys()) - self.query.evaluate(index)
+
+    def matches(self, index, key: str):
+        return not self.query.matches(index, key)
+
+    def restrict(self, index, candidates: set):
+        if self.query.estimate(index) <= len(candidates):
+            return candidates - self.query.evaluate(index)
+        return {key for key in candidates if not self.query.matches(index, key)}
+
+
+class And:
+    """
+    Contacts matching all queries
+    """
+
+    def __init__(self, queries: list):
+        self.queries = queries
+
+    def estimate(self, index):
+        return min(query.estimate(index) for query in self.queries)
+
+    def evaluate(self, index):
+        queries = sorted(self.queries, key=lambda query: query.estimate(index))
+        candidates = queries[0].evaluate(index)
+        for query in queries[1:]:
+            if not candidates:
+                break
+            candidates = query.restrict(index, candidates)
+        return candidates
+
+    def matches(self, index, key: str):
+        return all(query.matches(index, key) for query in self.queries)
+
+    def restrict(self, index, candidates: set):
+        for query in sorted(self.queries, key=lambda query: query.estimate(index)):
+            if not candidates:
+                break
+            candidates = query.restrict(index, candidates)
+        return candidates
+
+
+class Or:
+    """
+    Contacts matching any of queries
+    """
+
+    def __init__(self, queries: list):
+        self.queries = queries
+
+    def estimate(self, index):
+        return sum(query.estimate(index) for query in self.queries)
+
+    def evaluate(self, index):
+        return set().union(*(query.evaluate(index) for query in self.queries))
+
+    def matches(self, index, key: str):
+        return any(query.matches(index, key) for query in self.queries)
+
+    def restrict(self, index, candidates: set):
+        if self.estimate(index) <= len(candidates):
+            return candidates & self.evaluate(index)
+        return {key for key in candidates if self.matches(index, key)}
+
+
+def predicate(token: str, folded: bool = False):
+    """
+    Parse field:value or value token to Predicate
+    """
+    field, separator, value = token.partition(":")
+    if separator and field.lower() in FIELDS:
+        fields = (field.lower(),)
+    else:
+        fields, value = FIELDS, token
+    prefix = value.endswith("*")
+    value = value.rstrip("*")
+    if not value:
+        raise ValueError(f"Empty value in {token}")
+    if fields == ("birthday",):
+        if re.fullmatch(r"\d{1,2}", value) and 1 <= int(value) <= 12:
+            # birthday month is looked up by its name token
+            value, prefix = calendar.month_name[int(value)], False
+        elif re.fullmatch(r"\d{1,2}\.\d{1,2}", value):
+            day, month = value.split(".")
+            value, prefix = f"{int(day):02d}.{int(month):02d}.", True
+    elif fields == FIELDS:
+        # words without a field match beginnings of tokens as in plain search
+        prefix = True
+    if folded:
+        value = fold(value)
+    return Predicate(fields, value, prefix)
+
+
+def parse(query: str, folded: bool = False):
+    """
+    Parse query to a tree of Predicate, Not, And and Or objects. Raise ValueError if it's malformed
+    """
+    tokens = QUERY_TOKEN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise ValueError("Unexpected end of query")
+        position += 1
+        return token
+
+    def parse_or():
+        queries = [parse_and()]
+        while peek() == "OR":
+            take()
+            queries.append(parse_and())
+        return queries[0] if len(queries) == 1 else Or(queries)
+
+    def parse_and():
+        queries = [parse_not()]
+        while peek() not in (None, ")", "OR"):
+            if peek() == "AND":
+                take()
+            queries.append(parse_not())
+        return queries[0] if len(queries) == 1 else And(queries)
+
+    def parse_not():
+        token = take()
+        if token == "NOT":
+            return Not(parse_not())
+        if token == "(":
+            query = parse_or()
+            if take() != ")":
+                raise ValueError("Missing closing parenthesis")
+            return query
+        if token in (")", "AND", "OR"):
+            raise ValueError(f"Unexpected {token}")
+        return predicate(token, folded)
+
+    result = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()}")
+    return result
@@ -0,0 +1,149 @@
+"""Module providing birthday reminders printed while the bot is waiting for commands"""
+
+import asyncio
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+import heapq
+from .birthday_index import next_greeting
+from .birthdays_per_week import format_today
+from .settings import REMINDER_TIME
+
+# longest sleep, so a suspended computer or a changed clock delays a reminder at most that long
+MAX_SLEEP = 3600
+
+
+class ReminderScheduler:
+    """
+    Reminds of birthdays at REMINDER_TIME of the day they are greeted.
+    Next reminder times of contacts are kept in a min-heap of (time, name) entries;
+    the scheduler sleeps until the earliest one and wakes up earlier only when a birthday changes.
+    A change pushes an entry with the new time, the old entry is skipped when it comes up
+    """
+
+    def __init__(self, book, notify, at=REMINDER_TIME, clock=datetime.now):
+        """
+        notify(message) is called with the reminder message, clock() returns the current time
+        """
+        self.book = book
+        self.notify = notify
+        self.at = at
+        self.clock = clock
+        self._heap = []
+        # time of the current entry of every contact with birthday
+        self._due = {}
+        # (month, day) of the birthday of every scheduled contact
+        self._days = {}
+        # date when a contact was last reminded or greeted on start
+        self._fired = {}
+        self._wakeup = asyncio.Event()
+
+    def _reminder_time(self, name: str, month: int, day: int, now: datetime):
+        """
+        Return time of the next reminder of the contact. Reminder of today which time passed is due now,
+        unless the contact was already reminded today
+        """
+        today = now.date()
+        if self._fired.get(name) == today:
+            today += timedelta(days=1)
+        due = datetime.combine(next_greeting(month, day, today), self.at)
+        return max(due, now)
+
+    def build(self, now: datetime = None):
+        """
+        Schedule reminders of all birthdays of the address book.
+        Today's birthdays were greeted on start, so they're reminded next year
+        """
+        now = now or self.clock()
+        today = now.date()
+        index = self.book.birthday_index()
+        self._due = {}
+        self._days = {}
+        for name, month, day in zip(index.names, index.months, index.days):
+            if not month:
+                continue
+            if next_greeting(month, day, today) == today:
+                self._fired[name] = today
+            self._days[name] = (month, day)
+            self._due[name] = self._reminder_time(name, month, day, now)
+        self._heap = [(due, name) for name, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def record_changed(self, name: str, record):
+        """
+        Address book observer rescheduling reminder of a contact which birthday changed or which was deleted
+        """
+        birthday = record.birthday.value if record is not None and record.birthday else None
+        if birthday:
+            day = (birthday.month, birthday.day)
+            if self._days.get(name) == day:
+                return
+            self._days[name] = day
+            self._schedule(name, self._reminder_time(name, *day, self.clock()))
+        else:
+            self._days.pop(name, None)
+            self._fired.pop(name, None)
+            if self._due.pop(name, None) is None:
+                return
+            self._compact()
+        self._wakeup.set()
+
+    def _schedule(self, name: str, due: datetime):
+        if self._due.get(name) == due:
+            return
+        self._due[name] = due
+        heapq.heappush(self._heap, (due, name))
+        self._compact()
+
+    def _compact(self):
+        # rebuild the heap when most of its entries are outdated
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, name) for name, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def _skip_outdated(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def due(self, now: datetime):
+        """
+        Pop names of contacts reminded until now sorted by name and schedule their next reminders
+        """
+        names = []
+        self._skip_outdated()
+        while self._heap and self._heap[0][0] <= now:
+            _due, name = heapq.heappop(self._heap)
+            names.append(name)
+            del self._due[name]
+            # the next reminder is in a year
+            self._fired[name] = now.date()
+            self._schedule(name, self._reminder_time(name, *self._days[name], now))
+            self._skip_outdated()
+        return sorted(names)
+
+    def _build_holding(self, lock):
+        with lock:
+            self.build()
+
+    async def run(self, lock=nullcontext()):
+        """
+        Notify of reminders when they're due until the task is cancelled. Reminders are scheduled in a thread
+        holding lock, which guards changes of the address book, so reading all birthdays doesn't block the prompt
+        """
+        # changes made while reminders are scheduled reach record_changed after the build releases the lock
+        self.book.subscribe(self.record_changed)
+        try:
+            await asyncio.to_thread(self._build_holding, lock)
+            while True:
+                self._skip_outdated()
+                timeout = MAX_SLEEP
+                if self._heap:
+                    timeout = min(timeout, max(0, (self._heap[0][0] - self.clock()).total_seconds()))
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    names = self.due(self.clock())
+                    if names:
+                        self.notify(format_today(names))
+                self._wakeup.clear()
+        finally:
+            self.book.unsubscribe(self.record_changed)
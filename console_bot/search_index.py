@@ -0,0 +1,530 @@
+"""Module providing inverted index of address book records for search"""
+
+from bisect import bisect_left
+import calendar
+from collections import deque
+from collections.abc import Sized
+from contextlib import nullcontext
+from functools import lru_cache
+from heapq import heapify, heappop
+from itertools import islice
+import multiprocessing
+import re
+import time
+import unicodedata
+from .bulk import batched
+
+WORD = re.compile(r"\w+")
+FIELDS = ("name", "phone", "email", "address", "birthday")
+# number of compiled regular expressions of search terms kept between queries
+PATTERN_CACHE_SIZE = 64
+# combining diacritical marks left after NFKD decomposition of accented letters.
+# Breve and diaeresis after a Cyrillic letter are kept: й, ї, ё, ў are letters of their own, not accented и, і, е, у
+COMBINING_MARKS = re.compile(
+    "(?<![\u0400-\u04ff])[\u0306\u0308]"
+    "|[\u0300-\u0305\u0307\u0309-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]"
+)
+
+
+def fold(text: str):
+    """
+    Return text for case- and accent-insensitive matching: NFKD decomposed, without combining marks
+    (except those making Cyrillic letters), casefolded and NFKC composed
+    """
+    if text.isascii():
+        return text.lower()
+    stripped = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text))
+    return unicodedata.normalize("NFKC", stripped.casefold())
+
+
+def strip_accents(text: str):
+    """
+    Return text without combining marks (except those making Cyrillic letters), keeping its case
+    """
+    if text.isascii():
+        return text
+    return unicodedata.normalize(
+        "NFKC", COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text))
+    )
+
+
+def words(text: str):
+    """
+    Split text into words
+    """
+    return WORD.findall(text)
+
+
+def record_tokens(record, folded: bool = False):
+    """
+    Return tokens of every field of the record as dictionary field -> set of tokens.
+    With folded=True tokens are folded for case- and accent-insensitive search
+    """
+    tokens = {field: set() for field in FIELDS}
+    name = record.name.value
+    tokens["name"].update([name, *words(name)])
+    for phone in record.phones:
+        if phone.value:
+            tokens["phone"].add(phone.value)
+    for email in record.emails:
+        if email.value:
+            local, _at, domain = email.value.partition("@")
+            tokens["email"].update([email.value, local, domain, *words(email.value)])
+    for address in record.addresses:
+        if address.value:
+            tokens["address"].update(words(address.value))
+    if record.birthday and record.birthday.value:
+        date = record.birthday.value
+        day, month, year = f"{date.day:02d}", f"{date.month:02d}", str(date.year)
+        tokens["birthday"].update(
+            [
+                f"{day}.{month}.{year}",
+                day,
+                month,
+                year,
+                calendar.month_name[date.month],
+                record.birthday.ordinal(),
+            ]
+        )
+    if folded:
+        tokens = {
+            field: {fold(token) for token in field_tokens}
+            for field, field_tokens in tokens.items()
+        }
+    return tokens
+
+
+class TokenIndex:
+    """
+    Inverted index from field tokens to record keys.
+    Tokens of every field are kept sorted, so all tokens starting with a prefix are found by binary search.
+    New tokens are collected unsorted and merged into the sorted list once on the next prefix lookup.
+    Folded index keeps folded tokens and folded field texts of every record, computed when the record changes
+    """
+
+    def __init__(self, folded: bool = False):
+        self.folded = folded
+        self._postings = {field: {} for field in FIELDS}
+        self._sorted = {field: [] for field in FIELDS}
+        self._pending = {field: set() for field in FIELDS}
+        self._tokens = {}
+        self._texts = {}
+
+    @classmethod
+    def build(cls, items, folded: bool = False):
+        """
+        Build index from (key, record) pairs
+        """
+        index = cls(folded)
+        for key, record in items:
+            tokens = record_tokens(record, folded)
+            index._tokens[key] = tokens
+            if folded:
+                index._texts[key] = folded_field_texts(record)
+            for field, field_tokens in tokens.items():
+                postings = index._postings[field]
+                for token in field_tokens:
+                    postings.setdefault(token, set()).add(key)
+        for field in FIELDS:
+            index._sorted[field] = sorted(index._postings[field])
+        return index
+
+    def update(self, key: str, record):
+        """
+        Reindex the record with given key. Record is None if it was deleted
+        """
+        old_tokens = self._tokens.pop(key, None)
+        new_tokens = record_tokens(record, self.folded) if record is not None else None
+        if self.folded:
+            self._texts.pop(key, None)
+            if record is not None:
+                self._texts[key] = folded_field_texts(record)
+        for field in FIELDS:
+            old = old_tokens[field] if old_tokens else set()
+            new = new_tokens[field] if new_tokens else set()
+            for token in old - new:
+                self._remove(field, token, key)
+            for token in new - old:
+                self._add(field, token, key)
+        if new_tokens is not None:
+            self._tokens[key] = new_tokens
+
+    def _add(self, field: str, token: str, key: str):
+        postings = self._postings[field]
+        if token not in postings:
+            postings[token] = set()
+            self._pending[field].add(token)
+        postings[token].add(key)
+
+    def _remove(self, field: str, token: str, key: str):
+        postings = self._postings[field]
+        keys = postings[token]
+        keys.discard(key)
+        if not keys:
+            del postings[token]
+            pending = self._pending[field]
+            if token in pending:
+                pending.discard(token)
+            else:
+                tokens = self._sorted[field]
+                del tokens[bisect_left(tokens, token)]
+
+    def _sorted_tokens(self, field: str):
+        """
+        Return sorted tokens of the field, merging tokens added since the last lookup
+        """
+        tokens = self._sorted[field]
+        pending = self._pending[field]
+        if pending:
+            # both parts are sorted runs, so sort() merges them in linear time
+            tokens.extend(sorted(pending))
+            tokens.sort()
+            pending.clear()
+        return tokens
+
+    def lookup(self, field: str, token: str, prefix: bool = True):
+        """
+        Return set of keys of records having token (or token starting with given prefix) in the field
+        """
+        postings = self._postings[field]
+        if not prefix:
+            return set(postings.get(token, ()))
+        keys = set()
+        for _token, token_keys in self.prefix_items(field, token):
+            keys.update(token_keys)
+        return keys
+
+    def count(self, field: str, token: str, prefix: bool = True):
+        """
+        Return number of keys of records having token (or token starting with given prefix) in the field,
+        records matching several tokens are counted several times
+        """
+        if not prefix:
+            return len(self._postings[field].get(token, ()))
+        return sum(len(keys) for _token, keys in self.prefix_items(field, token))
+
+    def has_token(self, key: str, field: str, token: str, prefix: bool = True):
+        """
+        Return True if the record with given key has token (or token starting with given prefix) in the field
+        """
+        tokens = self._tokens[key][field]
+        if not prefix:
+            return token in tokens
+        return any(record_token.startswith(token) for record_token in tokens)
+
+    def keys(self):
+        """
+        Return keys of all indexed records
+        """
+        return self._tokens.keys()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def prefix_items(self, field: str, prefix: str):
+        """
+        Yield (token, keys) pairs for tokens of the field starting with prefix in sorted order
+        """
+        postings = self._postings[field]
+        tokens = self._sorted_tokens(field)
+        position = bisect_left(tokens, prefix)
+        while position < len(tokens) and tokens[position].startswith(prefix):
+            yield tokens[position], postings[tokens[position]]
+            position += 1
+
+    def field_texts(self, key: str):
+        """
+        Return folded field texts of the record with given key as dictionary field -> text
+        """
+        return self._texts[key]
+
+    def search(self, term: str):
+        """
+        Find records where every word of the term starts some token. Return IndexMatches
+        """
+        keys = None
+        word_keys = []
+        for word in words(term):
+            if self.folded:
+                word = fold(word)
+            field_keys = {field: self.lookup(field, word) for field in FIELDS}
+            word_keys.append(field_keys)
+            found = set().union(*field_keys.values())
+            keys = found if keys is None else keys & found
+            if not keys:
+                break
+        return IndexMatches(keys or set(), word_keys)
+
+
+class IndexMatches:
+    """
+    Keys found in the index. Iteration yields (key, set of matched fields) pairs sorted by key;
+    keys are ordered and fields computed only for pairs which are consumed
+    """
+
+    def __init__(self, keys: set, word_keys: list):
+        """
+        word_keys holds dictionary field -> matched keys for every word of the query
+        """
+        self.keys = keys
+        self.word_keys = word_keys
+
+    def discard(self, key: str):
+        self.keys.discard(key)
+
+    def fields(self, key: str):
+        """
+        Return fields in which the record with given key matched
+        """
+        return {
+            field
+            for field_keys in self.word_keys
+            for field, keys in field_keys.items()
+            if key in keys
+        }
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        heap = list(self.keys)
+        heapify(heap)
+        while heap:
+            key = heappop(heap)
+            yield key, self.fields(key)
+
+
+def field_texts(record):
+    """
+    Return text of every field of the record as dictionary field -> text
+    """
+    return {
+        "name": record.name.value,
+        "phone": ", ".join(phone.value for phone in record.phones if phone.value),
+        "email": ", ".join(email.value for email in record.emails if email.value),
+        "address": ", ".join(
+            address.value for address in record.addresses if address.value
+        ),
+        "birthday": (
+            f"{record.birthday.to_dict()} {record.birthday}"
+            if record.birthday and record.birthday.value
+            else ""
+        ),
+    }
+
+
+def folded_field_texts(record):
+    """
+    Return folded text of every field of the record as dictionary field -> text
+    """
+    return {field: fold(text) for field, text in field_texts(record).items()}
+
+
+class PatternError(ValueError):
+    """
+    Invalid regular expression of a search term, the message names the pattern and the error
+    """
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str, flags: int = 0):
+    """
+    Compile regular expression of a search term. Raise PatternError if it's invalid
+    """
+    try:
+        return re.compile(pattern, flags)
+    except re.error as error:
+        raise PatternError(f"Invalid regular expression {pattern}: {error}") from error
+
+
+class ScanMatches:
+    """
+    Records matched by checking their field texts one by one. Iteration yields (key, set of matched fields)
+    pairs and stops when the time budget is exhausted, then timed_out is set
+    """
+
+    # number of records checked between looking at the clock
+    CHECK_EVERY = 64
+
+    def __init__(self, items, match, budget: float):
+        """
+        items is iterable of (key, dictionary field -> text) pairs, match(text) returns True if text matches
+        """
+        self.items = items
+        self.match = match
+        self.budget = budget
+        self.timed_out = False
+
+    def __iter__(self):
+        deadline = time.monotonic() + self.budget
+        for count, (key, texts) in enumerate(self.items):
+            if count % self.CHECK_EVERY == 0 and time.monotonic() > deadline:
+                self.timed_out = True
+                return
+            fields = {field for field, text in texts.items() if self.match(text)}
+            if fields:
+                yield key, fields
+
+
+def match_texts(pattern: str, flags: int, items: list):
+    """
+    Return (key, set of matched fields) pairs of items whose field texts match the pattern.
+    It's run in a worker process of RegexScanMatches
+    """
+    search = compile_pattern(pattern, flags).search
+    found = []
+    for key, texts in items:
+        fields = {field for field, text in texts.items() if search(text)}
+        if fields:
+            found.append((key, fields))
+    return found
+
+
+class RegexScanMatches:
+    """
+    Records with field texts matching a regular expression. A match can't be interrupted and some
+    patterns take exponential time, so texts are sent in chunks to a worker process which is
+    terminated when the time budget is exhausted, then timed_out is set.
+    Field texts are read in the calling thread; while it waits for the worker it runs in `unlocked()`
+    """
+
+    # number of records sent to the worker at once
+    CHUNK_SIZE = 256
+    # chunks sent ahead, so the worker doesn't wait for the next one
+    IN_FLIGHT = 2
+    # worker process kept between searches, it's started again after it was terminated
+    _pool = None
+
+    def __init__(self, items, pattern: str, flags: int, budget: float, unlocked=nullcontext):
+        """
+        items is iterable of (key, dictionary field -> text) pairs. Pattern is compiled here, so
+        an invalid pattern raises ValueError before the worker is used
+        """
+        compile_pattern(pattern, flags)
+        self.items = items
+        self.pattern = pattern
+        self.flags = flags
+        self.budget = budget
+        self.unlocked = unlocked
+        self.timed_out = False
+
+    @classmethod
+    def _worker(cls):
+        if cls._pool is None:
+            # a spawned worker doesn't inherit locks held by other threads as a forked one would
+            cls._pool = multiprocessing.get_context("spawn").Pool(1)
+        return cls._pool
+
+    @classmethod
+    def _terminate_worker(cls):
+        if cls._pool is not None:
+            cls._pool.terminate()
+            cls._pool = None
+
+    def __iter__(self):
+        deadline = time.monotonic() + self.budget
+        chunks = batched(self.items, self.CHUNK_SIZE)
+        pool = self._worker()
+        pending = deque()
+        try:
+            while True:
+                for chunk in islice(chunks, self.IN_FLIGHT - len(pending)):
+                    pending.append(pool.apply_async(match_texts, (self.pattern, self.flags, chunk)))
+                if not pending:
+                    return
+                found = self._wait(pending[0], deadline)
+                if found is None:
+                    self.timed_out = True
+                    return
+                pending.popleft()
+                yield from found
+        finally:
+            # the page is filled or the budget is exhausted: chunks sent ahead are let finish within
+            # the budget, so the worker can be used again, otherwise it may be stuck in a slow match
+            for result in pending:
+                if self._wait(result, deadline) is None:
+                    self._terminate_worker()
+                    break
+
+    def _wait(self, result, deadline: float):
+        """
+        Return matches found in a chunk or None if the time budget is exhausted
+        """
+        try:
+            with self.unlocked():
+                return result.get(max(deadline - time.monotonic(), 0))
+        except multiprocessing.TimeoutError:
+            return None
+
+
+class SearchResult:
+    """
+    Result of address book search: record found by exact name and one page of
+    records matched in other fields with names of matched fields.
+    Matches are consumed only up to the end of the page, records are rendered by __str__
+    """
+
+    def __init__(
+        self, term: str, records, name_match, matches, limit=None, offset=0, by_name=True
+    ):
+        """
+        records maps keys to Record objects, name_match is key of the record with name equal to the term or None,
+        matches is iterable of (key, set of matched fields) pairs, it's consumed only up to the end of the page.
+        by_name is False for queries which don't look up the term as a name
+        """
+        self.term = term
+        self.by_name = by_name
+        self.records = records
+        self.name_match = name_match
+        self.limit = limit
+        self.offset = offset
+        self.total = len(matches) if isinstance(matches, Sized) else None
+        stop = None if limit is None else offset + limit + 1
+        iterator = iter(matches)
+        self.matches = list(islice(iterator, offset, stop))
+        # a scan is stopped when the page is filled
+        if hasattr(iterator, "close"):
+            iterator.close()
+        self.has_more = limit is not None and len(self.matches) > limit
+        if self.has_more:
+            self.matches = self.matches[:limit]
+        self.timed_out = getattr(matches, "timed_out", False)
+        self.budget = getattr(matches, "budget", None)
+
+    @property
+    def keys(self):
+        """Keys of records matched in fields other than name on this page"""
+        return [key for key, _fields in self.matches]
+
+    def __iter__(self):
+        return iter(self.matches)
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __str__(self):
+        if not self.by_name:
+            res1 = ""
+        elif self.name_match is None:
+            res1 = "\nNot found in names"
+        else:
+            res1 = (
+                f"\nFound record with name: '{self.name_match}'. "
+                f"\nResult: {str(self.records[self.name_match])}"
+            )
+        if self.matches:
+            header = "-=Found in other fields=-" if self.by_name else "-=Found=-"
+            res = f"\n{header}\n" + "".join(
+                f"{str(self.records[key])}\n" for key in self.keys
+            )
+        else:
+            res = "\nNothing found in fields\n" if self.by_name else "\nNothing found\n"
+        if self.has_more:
+            shown = f"Shown {self.offset + 1}-{self.offset + len(self.matches)}"
+            if self.total is not None:
+                shown += f" of {self.total}"
+            next_page = self.offset // self.limit + 2
+            res += f"{shown}. Next page: search {self.term} --page {next_page}\n"
+        if self.timed_out:
+            res += f"Search stopped after {self.budget:g} s, results may be incomplete\n"
+        return res1 + res
@@ -0,0 +1,52 @@
+"""Module providing console bot settings which can be overridden with environment variables"""
+
+from datetime import time
+import os
+
+# Seconds between background saves of changed address book and notebook
+FLUSH_INTERVAL = float(os.environ.get("CONSOLE_BOT_FLUSH_INTERVAL", "2.0"))
+
+# How address book and notebook are stored: "json" rewrites the whole file on save,
+# "journal" appends every change to a journal next to the file,
+# "sqlite" keeps the address book in a database next to the file,
+# "binary" keeps the address book in a memory-mapped snapshot next to the file,
+# "sharded" splits the address book into shard files in a directory next to the file
+# (with "sqlite", "binary" and "sharded" the notebook is stored as in "json")
+STORAGE = os.environ.get("CONSOLE_BOT_STORAGE", "json")
+
+# Number of journal entries after which the journal is folded into the snapshot file
+JOURNAL_COMPACT_AFTER = int(os.environ.get("CONSOLE_BOT_JOURNAL_COMPACT_AFTER", "1000"))
+
+# Number of shard files and how records are assigned to them in "sharded" storage:
+# "hash" spreads names evenly, "prefix" keeps names starting with the same letter together.
+# Used when the shards directory is created
+SHARDS = int(os.environ.get("CONSOLE_BOT_SHARDS", "16"))
+SHARD_PARTITION = os.environ.get("CONSOLE_BOT_SHARD_PARTITION", "hash")
+
+# Keep records loaded from JSON as dictionaries until they are accessed ("1" or "0")
+LAZY_LOAD = os.environ.get("CONSOLE_BOT_LAZY_LOAD", "1") == "1"
+
+# Number of records read and validated together during import
+IMPORT_BATCH_SIZE = int(os.environ.get("CONSOLE_BOT_IMPORT_BATCH_SIZE", "10000"))
+
+# Number of contacts shown on one page of search results
+SEARCH_PAGE_SIZE = int(os.environ.get("CONSOLE_BOT_SEARCH_PAGE_SIZE", "20"))
+
+# Seconds after which search stops checking contacts one by one (substring and "re:" searches)
+SEARCH_TIME_BUDGET = float(os.environ.get("CONSOLE_BOT_SEARCH_TIME_BUDGET", "2.0"))
+
+# Ignore case and accents in search and find-notes ("1" or "0")
+SEARCH_FOLD = os.environ.get("CONSOLE_BOT_SEARCH_FOLD", "0") == "1"
+
+# Compute upcoming birthdays with NumPy when it's installed ("1" or "0")
+VECTORIZE_BIRTHDAYS = os.environ.get("CONSOLE_BOT_VECTORIZE_BIRTHDAYS", "1") == "1"
+
+# Remind of birthdays while the bot is running ("1" or "0") and time of the day of reminders (HH:MM)
+REMINDERS = os.environ.get("CONSOLE_BOT_REMINDERS", "1") == "1"
+REMINDER_TIME = time.fromisoformat(os.environ.get("CONSOLE_BOT_REMINDER_TIME", "09:00"))
+
+# Number of notes shown by top-notes
+TOP_NOTES = int(os.environ.get("CONSOLE_BOT_TOP_NOTES", "10"))
+
+# Maximal number of typos in a contact name for which similar names are suggested
+FUZZY_MAX_DISTANCE = int(os.environ.get("CONSOLE_BOT_FUZZY_MAX_DISTANCE", "2"))
@@ -0,0 +1,130 @@
+"""Module providing address book storage split into several JSON shard files"""
+
+from collections.abc import MutableMapping
+import json
+import os
+import zlib
+from .storage import atomic_write, dump_json_object, file_fingerprint, iter_json_object
+
+META_FILE = "shards.json"
+
+
+def shard_of(name: str, shards: int, partition: str = "hash"):
+    """
+    Return index of the shard keeping the record with given name.
+    "hash" spreads names evenly, "prefix" keeps names starting with the same letter together
+    """
+    key = name[:1].casefold() if partition == "prefix" else name
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+class ShardedRecordStore(MutableMapping):
+    """
+    Mapping of contact name to Record kept in a directory of JSON shard files.
+    A shard is read when a record from it is accessed for the first time,
+    and only changed shards are written by save()
+    """
+
+    def __init__(
+        self, directory: str, record_factory, shards: int = 16, partition: str = "hash"
+    ):
+        """
+        record_factory converts a record dictionary (as in Record.to_dict) to a Record.
+        shards and partition are used only when the directory is created, after that
+        they are read from its meta file
+        """
+        self.directory = directory
+        self.record_factory = record_factory
+        meta_filename = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_filename):
+            with open(meta_filename, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            shards, partition = meta["shards"], meta["partition"]
+        self.shards = shards
+        self.partition = partition
+        self._loaded = {}
+        self._dirty = set()
+
+    def _filename(self, index: int):
+        return os.path.join(self.directory, f"shard-{index:03d}.json")
+
+    def _shard(self, index: int):
+        if index not in self._loaded:
+            records = {}
+            filename = self._filename(index)
+            if os.path.exists(filename):
+                with open(filename, "rb") as file:
+                    for name, record_data in iter_json_object(file):
+                        records[name] = self.record_factory(record_data)
+            self._loaded[index] = records
+        return self._loaded[index]
+
+    def _shard_of(self, name: str):
+        return shard_of(name, self.shards, self.partition)
+
+    def __getitem__(self, name: str):
+        return self._shard(self._shard_of(name))[name]
+
+    def __setitem__(self, name: str, record):
+        index = self._shard_of(name)
+        self._shard(index)[name] = record
+        self._dirty.add(index)
+
+    def __delitem__(self, name: str):
+        index = self._shard_of(name)
+        del self._shard(index)[name]
+        self._dirty.add(index)
+
+    def __contains__(self, name):
+        return name in self._shard(self._shard_of(name))
+
+    def __iter__(self):
+        for index in range(self.shards):
+            yield from list(self._shard(index))
+
+    def __len__(self):
+        return sum(len(self._shard(index)) for index in range(self.shards))
+
+    def record_changed(self, name: str, record):
+        """
+        Address book observer marking the shard of a record changed in place
+        """
+        self._dirty.add(self._shard_of(name))
+
+    def save(self):
+        """
+        Write changed shards
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        meta_filename = os.path.join(self.directory, META_FILE)
+        if not os.path.exists(meta_filename):
+            with atomic_write(meta_filename) as file:
+                json.dump({"shards": self.shards, "partition": self.partition}, file)
+        for index in sorted(self._dirty):
+            with atomic_write(self._filename(index)) as file:
+                dump_json_object(
+                    (
+                        (name, record.to_dict())
+                        for name, record in self._loaded[index].items()
+                    ),
+                    file,
+                )
+        self._dirty.clear()
+
+    def fingerprint(self):
+        """
+        Return fingerprints of the meta and shard files, they change whenever a shard is written
+        """
+        return [
+            file_fingerprint(os.path.join(self.directory, META_FILE)),
+            *(file_fingerprint(self._filename(index)) for index in range(self.shards)),
+        ]
+
+    def import_file(self, filename: str, progress=None):
+        """
+        Distribute records from address book JSON file into shards and write them
+        """
+        with open(filename, "rb") as file:
+            for name, record_data in iter_json_object(file, progress):
+                self[name] = self.record_factory(record_data)
+        self.save()
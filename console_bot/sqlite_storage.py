@@ -0,0 +1,170 @@
+"""Module providing SQLite storage for address book records"""
+
+from collections.abc import MutableMapping
+from itertools import groupby
+import sqlite3
+from .storage import file_fingerprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    name TEXT PRIMARY KEY,
+    birthday TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS phones (
+    name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    phone TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS emails (
+    name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    name TEXT NOT NULL REFERENCES records(name) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    address TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phones_name ON phones(name);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones(phone);
+CREATE INDEX IF NOT EXISTS emails_name ON emails(name);
+CREATE INDEX IF NOT EXISTS addresses_name ON addresses(name);
+"""
+
+# table name and value column of every list field of a record
+LIST_FIELDS = {"phones": "phone", "emails": "email", "addresses": "address"}
+
+
+class SQLiteRecordStore(MutableMapping):
+    """
+    Mapping of contact name to Record stored in SQLite database.
+    Records are read from the database only when they are accessed and kept in memory after that.
+    Changes are written into an open transaction which is committed by save().
+    """
+
+    def __init__(self, filename: str, record_factory):
+        """
+        record_factory converts a record dictionary (as in Record.to_dict) to a Record
+        """
+        self.filename = filename
+        self.record_factory = record_factory
+        # the background flusher commits from another thread, access is serialized by its lock
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self._records = {}
+        # name of the record written by __setitem__, the change event following it doesn't write it again
+        self._just_written = None
+
+    def __getitem__(self, name: str):
+        if name not in self._records:
+            record_data = self._read(name)
+            if record_data is None:
+                raise KeyError(name)
+            self._records[name] = self.record_factory(record_data)
+        return self._records[name]
+
+    def __setitem__(self, name: str, record):
+        self._records[name] = record
+        self.write(name, record.to_dict())
+        self._just_written = name
+
+    def __delitem__(self, name: str):
+        if name not in self:
+            raise KeyError(name)
+        self._records.pop(name, None)
+        self.connection.execute("DELETE FROM records WHERE name = ?", (name,))
+
+    def __contains__(self, name):
+        if name in self._records:
+            return True
+        row = self.connection.execute(
+            "SELECT 1 FROM records WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        for (name,) in self.connection.execute("SELECT name FROM records"):
+            yield name
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def record_changed(self, name: str, record):
+        """
+        Address book observer writing a record changed in place back to the database
+        """
+        just_written, self._just_written = self._just_written, None
+        if record is not None and name != just_written:
+            self.write(name, record.to_dict())
+
+    def phone_prefix_items(self, prefix: str):
+        """
+        Yield (phone, names) pairs for phones starting with prefix in sorted order, found with phones_phone index
+        """
+        rows = self.connection.execute(
+            "SELECT phone, name FROM phones WHERE phone >= ? AND phone < ? ORDER BY phone, name",
+            # phones are digits, every phone starting with prefix is less than prefix + "\uffff"
+            (prefix, prefix + "\uffff"),
+        )
+        for phone, phone_rows in groupby(rows, key=lambda row: row[0]):
+            yield phone, {name for _phone, name in phone_rows}
+
+    def write(self, name: str, record_data: dict):
+        """
+        Replace rows of the record with given dictionary
+        """
+        self.connection.execute(
+            "INSERT INTO records (name, birthday) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET birthday = excluded.birthday",
+            (name, record_data["birthday"]),
+        )
+        for table, column in LIST_FIELDS.items():
+            self.connection.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+            self.connection.executemany(
+                f"INSERT INTO {table} (name, position, {column}) VALUES (?, ?, ?)",
+                [
+                    (name, position, value)
+                    for position, value in enumerate(record_data[table])
+                ],
+            )
+
+    def import_items(self, items):
+        """
+        Write (name, record dictionary) pairs without creating Record objects
+        """
+        for name, record_data in items:
+            self.write(name, record_data)
+        self.save()
+
+    def save(self):
+        """
+        Commit all changes to the database file
+        """
+        self.connection.commit()
+
+    def fingerprint(self):
+        """
+        Return fingerprint of the database file, it changes whenever changes are committed
+        """
+        return file_fingerprint(self.filename)
+
+    def close(self):
+        self.connection.close()
+
+    def _read(self, name: str):
+        row = self.connection.execute(
+            "SELECT name, birthday FROM records WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        record_data = {"name": row[0], "birthday": row[1]}
+        for table, column in LIST_FIELDS.items():
+            record_data[table] = [
+                value
+                for (value,) in self.connection.execute(
+                    f"SELECT {column} FROM {table} WHERE name = ? ORDER BY position",
+                    (name,),
+                )
+            ]
+        return record_data
@@ -0,0 +1,342 @@
+"""Module providing helpers for persisting address book and notebook data"""
+
+import codecs
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+# permissions are masked by umask when open() creates a file, mkstemp() creates files readable by the owner only
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+@contextmanager
+def atomic_write(filename: str, mode: str = "w", encoding: str = "utf-8"):
+    """
+    Open a temporary file next to `filename` for writing and move it over
+    `filename` only when the block finishes without errors, so a crash in the
+    middle of a write never leaves a truncated file behind.
+    The file keeps permissions of the replaced file, a new file gets them as from open().
+    """
+    if "b" in mode:
+        encoding = None
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{os.path.basename(filename)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        try:
+            permissions = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            permissions = 0o666 & ~UMASK
+        os.chmod(tmp_name, permissions)
+        with os.fdopen(fd, mode, encoding=encoding) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_name, filename)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+class WriteBehindFlusher:
+    """
+    Background thread calling `save_func` every `interval` seconds.
+    Commands hold `lock` while they mutate data, so a flush never sees
+    a half-applied change, and bursts of changes are written once.
+    A failed save is passed to `on_error` and retried on the next flush,
+    the same error is reported once until a save succeeds.
+    """
+
+    def __init__(self, save_func, interval: float = 2.0, on_error=None):
+        self.save_func = save_func
+        self.interval = interval
+        self.on_error = on_error or report_save_error
+        self.lock = threading.RLock()
+        self._last_error = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind-flusher", daemon=True
+        )
+
+    def start(self):
+        """Start the background flushing thread."""
+        self._thread.start()
+        return self
+
+    def flush(self):
+        """Run `save_func` right away under the lock."""
+        with self.lock:
+            self.save_func()
+
+    @contextmanager
+    def unlocked(self):
+        """
+        Release the lock held by the calling thread for the duration of the block,
+        e.g. while a command waits for a slow search without changing data
+        """
+        self.lock.release()
+        try:
+            yield
+        finally:
+            self.lock.acquire()
+
+    def stop(self):
+        """Stop the background thread and write any pending changes."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        # there is no next try, an error of the last save is raised
+        self.flush()
+
+    def _try_flush(self):
+        try:
+            self.flush()
+        except Exception as error:  # keep the thread running after a failed save
+            if repr(error) != self._last_error:
+                self._last_error = repr(error)
+                self.on_error(error)
+        else:
+            self._last_error = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._try_flush()
+
+
+def report_save_error(error: Exception):
+    """Print an error of a background save, changes stay unsaved until a save succeeds"""
+    print(f"Saving failed, changes will be saved on the next try: {error}", file=sys.stderr)
+
+
+def file_fingerprint(filename: str):
+    """
+    Return [size, modification time] of the file or None if it doesn't exist
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Journal:
+    """
+    Append-only log of changes made after the snapshot file was written.
+    The first line of the journal holds the fingerprint of the snapshot it
+    belongs to, so a journal left over from before a compaction is ignored.
+    """
+
+    def __init__(self, snapshot: str, compact_after: int = 1000):
+        self.snapshot = snapshot
+        self.path = snapshot + ".journal"
+        self.compact_after = compact_after
+        self.entries = 0
+        self._file = None
+
+    def replay(self):
+        """
+        Return entries written for the current snapshot. A torn last line
+        left by a crash is dropped
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        if not lines:
+            return []
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return []
+        if header.get("snapshot") != file_fingerprint(self.snapshot):
+            return []
+        entries = []
+        for line in lines[1:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+        return entries
+
+    def open(self, entries: list):
+        """
+        Start appending after already replayed entries
+        """
+        if entries:
+            # rewrite the journal so a torn last line doesn't hide new entries
+            self.entries = len(entries)
+            with atomic_write(self.path) as file:
+                file.write(self._header())
+                for entry in entries:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        else:
+            self.reset()
+
+    def append(self, entry: dict):
+        """
+        Append a single change to the journal
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.entries += 1
+
+    @property
+    def needs_compaction(self):
+        """True if the journal grew long enough to be folded into the snapshot"""
+        return self.entries >= self.compact_after
+
+    def reset(self):
+        """
+        Start an empty journal for the current snapshot file
+        """
+        self.close()
+        with atomic_write(self.path) as file:
+            file.write(self._header())
+        self.entries = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _header(self):
+        return json.dumps({"snapshot": file_fingerprint(self.snapshot)}) + "\n"
+
+
+def iter_json_object(file, progress=None, chunk_size: int = 1 << 16):
+    """
+    Yield (key, value) pairs of the top-level JSON object from a file opened in binary mode,
+    reading only as much of the file as is needed for the next value.
+    progress(bytes_read, total_bytes) is called after every chunk if given
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    total = os.fstat(file.fileno()).st_size
+    bytes_read = 0
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, bytes_read, eof
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        bytes_read += len(chunk)
+        buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        if progress:
+            progress(bytes_read, total)
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos] if pos < len(buffer) else ""
+            read_more()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # a number may continue in the next chunk
+                if end < len(buffer) or eof:
+                    pos = end
+                    return value
+            read_more()
+
+    def expect(char):
+        nonlocal pos
+        if next_char() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", buffer, pos)
+        pos += 1
+
+    expect("{")
+    if next_char() == "}":
+        return
+    while True:
+        key = decode()
+        expect(":")
+        next_char()
+        yield key, decode()
+        if next_char() == "}":
+            return
+        expect(",")
+        next_char()
+
+
+def dump_json_object(items, file):
+    """
+    Write (key, value) pairs as a JSON object one pair at a time
+    """
+    file.write("{")
+    separator = ""
+    for key, value in items:
+        file.write(f"{separator}{json.dumps(key)}: {json.dumps(value)}")
+        separator = ", "
+    file.write("}")
+
+
+class LazyRecordMap(MutableMapping):
+    """
+    Mapping of contact name to Record which keeps records as dictionaries
+    (as in Record.to_dict) until they are accessed for the first time
+    """
+
+    def __init__(self, record_factory):
+        """
+        record_factory converts a record dictionary to a Record
+        """
+        self.record_factory = record_factory
+        self._data = {}
+
+    def set_raw(self, name: str, record_data: dict):
+        """
+        Add record dictionary which is converted to a Record on first access
+        """
+        self._data[name] = record_data
+
+    def __getitem__(self, name: str):
+        value = self._data[name]
+        if isinstance(value, dict):
+            value = self._data[name] = self.record_factory(value)
+        return value
+
+    def __setitem__(self, name: str, record):
+        self._data[name] = record
+
+    def __delitem__(self, name: str):
+        del self._data[name]
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def iter_dicts(self):
+        """
+        Yield (name, record dictionary) pairs without creating Record objects
+        for records which were not accessed
+        """
+        for name, value in self._data.items():
+            yield name, value if isinstance(value, dict) else value.to_dict()
@@ -0,0 +1,61 @@
+"""Module providing validators of contact fields, batched ones check many values at once"""
+
+from datetime import datetime
+import re
+
+PHONE_PATTERN = re.compile(r"[0-9]{10}")
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+
+def parse_date(value: str):
+    """
+    Parse date in '%d.%m.%Y' format written with ASCII digits. Return None if date is invalid.
+    Unlike datetime.strptime, a day padded with a space and non-ASCII digits are not accepted
+    """
+    parts = value.split(".")
+    if len(parts) != 3:
+        return None
+    day, month, year = parts
+    digits = day + month + year
+    if not (
+        0 < len(day) <= 2
+        and 0 < len(month) <= 2
+        and len(year) == 4
+        and digits.isascii()
+        and digits.isdigit()
+    ):
+        return None
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def validate_phones(values: list[str]):
+    """
+    Check many phone numbers at once. Return list of flags if phone is valid
+    """
+    fullmatch = PHONE_PATTERN.fullmatch
+    return [fullmatch(value) is not None for value in values]
+
+
+def validate_emails(values: list[str]):
+    """
+    Check many emails at once. Return list of flags if email is valid
+    """
+    fullmatch = EMAIL_PATTERN.fullmatch
+    return [fullmatch(value) is not None for value in values]
+
+
+def validate_addresses(values: list[str]):
+    """
+    Check many addresses at once. Return list of flags if address is valid
+    """
+    return [isinstance(value, str) and len(value) > 0 for value in values]
+
+
+def parse_dates(values: list[str]):
+    """
+    Parse many dates in '%d.%m.%Y' format at once. Return list of datetime or None for invalid dates
+    """
+    return [parse_date(value) for value in values]
@@ -0,0 +1,51 @@
+from datetime import datetime
+import pytest
+from console_bot.address_book import Address, AddressBook, Birthday, Email, Phone, Record
+
+RECORD_DATA = {
+    "name": "Ann",
+    "birthday": "21.03.1993",
+    "phones": ["0123456789"],
+    "emails": ["ann@example.com"],
+    "addresses": ["Kyiv, Khreshchatyk 1"],
+}
+
+
+def test_record_dict_round_trip():
+    record = Record.from_dict(RECORD_DATA)
+    assert record.to_dict() == RECORD_DATA
+    assert record.birthday.value == datetime(1993, 3, 21)
+
+
+@pytest.mark.parametrize("field", [Record("Ann"), Phone("0123456789"), Email("a@b.cc"), Address("Kyiv"), Birthday("01.01.2000")])
+def test_records_and_fields_have_no_instance_dict(field):
+    assert not hasattr(field, "__dict__")
+    with pytest.raises(AttributeError):
+        field.unknown = 1
+
+
+@pytest.mark.parametrize(
+    "field_class, value",
+    [(Phone, "12345"), (Email, "not an email"), (Address, ""), (Birthday, "31.02.2000")],
+)
+def test_invalid_field_values(field_class, value):
+    assert not field_class(value).is_valid()
+
+
+def test_lazy_book_converts_records_on_access():
+    book = AddressBook.from_dict({"Ann": RECORD_DATA, "Bob": dict(RECORD_DATA, name="Bob")}, lazy=True)
+    assert all(isinstance(value, dict) for value in book.data._data.values())
+    assert book["Ann"].phones[0].value == "0123456789"
+    assert isinstance(book.data._data["Ann"], Record)
+    assert isinstance(book.data._data["Bob"], dict)
+    # saving doesn't convert records which were not accessed
+    assert dict(book.iter_dicts()) == {"Ann": RECORD_DATA, "Bob": dict(RECORD_DATA, name="Bob")}
+    assert isinstance(book.data._data["Bob"], dict)
+
+
+def test_lazy_and_eager_books_are_equal():
+    data = {"Ann": RECORD_DATA, "Bob": dict(RECORD_DATA, name="Bob", birthday="")}
+    lazy = AddressBook.from_dict(data, lazy=True)
+    eager = AddressBook.from_dict(data)
+    assert sorted(lazy) == sorted(eager)
+    assert [str(lazy[name]) for name in sorted(lazy)] == [str(eager[name]) for name in sorted(eager)]
@@ -0,0 +1,111 @@
+import json
+import os
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot import binary_storage
+from console_bot.binary_storage import BinarySnapshotStore, decode_record, encode_record
+
+RECORDS = {
+    "Ann": {
+        "name": "Ann",
+        "birthday": "29.02.1992",
+        "phones": ["0123456789", "0987654321"],
+        "emails": ["ann@example.com"],
+        "addresses": [],
+    },
+    "Тарас": {
+        "name": "Тарас",
+        "birthday": "",
+        "phones": [],
+        "emails": [],
+        "addresses": ["Київ, вул. Хрещатик 1"],
+    },
+}
+
+
+@pytest.fixture
+def filename(tmp_path):
+    filename = tmp_path / "address_book.json"
+    filename.write_text(json.dumps(RECORDS, ensure_ascii=False), encoding="utf-8")
+    return str(filename)
+
+
+def test_encode_decode_round_trip():
+    for name, record_data in RECORDS.items():
+        assert decode_record(name, encode_record(record_data)) == record_data
+
+
+def test_json_is_converted_to_snapshot(filename):
+    book = AddressBook.load_from_file(filename, storage="binary")
+    assert os.path.exists(filename[: -len(".json")] + ".bin")
+    assert book.to_dict() == RECORDS
+    # iter_dicts decodes records without creating Record objects
+    assert book.data._records == {}
+
+
+def test_round_trip_with_changes(filename):
+    book = AddressBook.load_from_file(filename, storage="binary")
+    record = Record("Bob")
+    record.add_phone("1112223333")
+    book.add_contact(record)
+    book.add_email("Ann", "ann@work.com")
+    book.delete("Тарас")
+    book.save_to_file(filename)
+
+    reopened = AddressBook.load_from_file(filename, storage="binary")
+    assert sorted(reopened.keys()) == ["Ann", "Bob"]
+    assert reopened["Ann"].to_dict()["emails"] == ["ann@example.com", "ann@work.com"]
+    assert reopened["Bob"].to_dict()["phones"] == ["1112223333"]
+    assert "Тарас" not in reopened
+    reopened.data._close()
+
+
+def test_deleted_and_added_again(filename):
+    book = AddressBook.load_from_file(filename, storage="binary")
+    book.delete("Ann")
+    assert "Ann" not in book
+    book.add_contact(Record("Ann"))
+    assert len(book) == 2
+    book.save_to_file(filename)
+    assert AddressBook.load_from_file(filename, storage="binary")["Ann"].phones == []
+
+
+def test_lookup_decodes_only_accessed_record(filename):
+    book = AddressBook.load_from_file(filename, storage="binary")
+    assert "Тарас" in book
+    assert book["Ann"].birthday.value.month == 2
+    assert list(book.data._records) == ["Ann"]
+
+
+def test_rejects_foreign_file(tmp_path):
+    snapshot = tmp_path / "address_book.bin"
+    snapshot.write_bytes(b"NOPE" + bytes(20))
+    with pytest.raises(ValueError):
+        BinarySnapshotStore(str(snapshot), Record.from_dict)
+
+
+def test_failed_save_keeps_records_for_retry(filename, monkeypatch):
+    book = AddressBook.load_from_file(filename, storage="binary")
+    book.add_contact(Record("Bob"))
+    write_snapshot = binary_storage.write_snapshot
+    calls = []
+
+    def fail_once(items, filename):
+        calls.append(filename)
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+        write_snapshot(items, filename)
+
+    monkeypatch.setattr(binary_storage, "write_snapshot", fail_once)
+    with pytest.raises(OSError):
+        book.save_to_file(filename)
+    assert sorted(book.keys()) == ["Ann", "Bob", "Тарас"]
+    book.save_to_file(filename)
+    reopened = AddressBook.load_from_file(filename, storage="binary")
+    assert reopened.to_dict() == {**RECORDS, "Bob": Record("Bob").to_dict()}
+
+
+@pytest.mark.parametrize("birthday", ["29.02.1991", " 1.01.1990", "31.12.990", "bad"])
+def test_invalid_birthday_is_not_encoded(birthday):
+    record_data = {**RECORDS["Тарас"], "birthday": birthday}
+    assert decode_record("Тарас", encode_record(record_data))["birthday"] == ""
@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta
+import pytest
+from console_bot.birthday_index import BirthdayIndex, next_greeting
+from console_bot.birthdays_per_week import BirthdayCalendar, users_calendar
+
+# every day of a leap year
+BIRTHDAYS = [date(2000, 1, 1) + timedelta(days=offset) for offset in range(366)]
+WINDOWS = [1, 3, 7, 30, 365, 400]
+
+
+def days_between(first: date, last: date):
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+# 29 February of leap and non-leap years, a non-leap century, year ends and weekends around them
+TODAYS = (
+    days_between(date(2023, 12, 20), date(2024, 1, 10))
+    + days_between(date(2024, 2, 20), date(2024, 3, 10))
+    + days_between(date(2025, 2, 20), date(2025, 3, 10))
+    + days_between(date(2100, 2, 25), date(2100, 3, 3))
+)
+
+
+def make_index():
+    return BirthdayIndex.from_users(
+        [{"name": f"{birthday:%m-%d}", "birthday": birthday} for birthday in BIRTHDAYS]
+    )
+
+
+def expected_upcoming(today: date, days: int):
+    """Greetings computed contact by contact"""
+    hits = []
+    for birthday in BIRTHDAYS:
+        greeted = next_greeting(birthday.month, birthday.day, today)
+        if (greeted - today).days < days:
+            hits.append((greeted, f"{birthday:%m-%d}"))
+    return sorted(hits)
+
+
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_upcoming_agrees_with_next_greeting(today):
+    index = make_index()
+    for days in WINDOWS:
+        assert index.upcoming(today, days) == expected_upcoming(today, days)
+
+
+@pytest.mark.parametrize(
+    "today, greeted",
+    [
+        (date(2024, 2, 28), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2025, 3, 3)),
+        (date(2025, 3, 1), date(2025, 3, 3)),
+        (date(2023, 3, 1), date(2023, 3, 1)),
+        (date(2100, 3, 1), date(2100, 3, 1)),
+    ],
+)
+def test_leap_day_birthday_is_greeted_once(today, greeted):
+    index = BirthdayIndex.from_users([{"name": "Leap", "birthday": date(1992, 2, 29)}])
+    assert index.upcoming(today, 400) == [(greeted, "Leap")]
+
+
+@pytest.mark.parametrize(
+    "month, day, today, greeted",
+    [
+        (2, 29, date(2024, 2, 1), date(2024, 2, 29)),
+        (2, 29, date(2023, 2, 1), date(2023, 3, 1)),
+        (12, 31, date(2024, 12, 31), date(2024, 12, 31)),
+        (1, 1, date(2024, 12, 31), date(2025, 1, 1)),
+        # 4 January 2025 is Saturday
+        (1, 4, date(2025, 1, 2), date(2025, 1, 6)),
+        (1, 4, date(2025, 1, 5), date(2026, 1, 5)),
+    ],
+)
+def test_next_greeting(month, day, today, greeted):
+    assert next_greeting(month, day, today) == greeted
+
+
+def test_changes_are_indexed():
+    index = make_index()
+    version = index.version
+    index.set("02-29", date(1990, 3, 1))
+    index.set("12-31", None)
+    index.set("New", date(1990, 12, 31))
+    assert index.version == version + 3
+    assert index.born_on(date(2024, 3, 1)) == {"03-01", "02-29"}
+    assert index.born_on(date(2024, 12, 31)) == {"New"}
+    assert len(index) == 366
+
+
+def baseline_greeting(current_date: date, user_birthday: date):
+    """prepare_birthday_date of the functions the calendar replaced"""
+    birthday_this_year = user_birthday.replace(year=current_date.year)
+    if birthday_this_year < current_date:
+        birthday_this_year = birthday_this_year.replace(year=current_date.year + 1)
+    if birthday_this_year.weekday() in [5, 6]:
+        birthday_this_year += timedelta(days=7 - birthday_this_year.weekday())
+    return birthday_this_year
+
+
+def baseline_lines(users: list, today: date, days: int, date_format: str):
+    """Lines 'date: names' as the replaced functions built them, as dictionary date -> set of names"""
+    result = {}
+    for user in users:
+        greeted = baseline_greeting(today, user["birthday"].date())
+        if (greeted - today).days < days:
+            result.setdefault(greeted.strftime(date_format), set()).add(user["name"])
+    return result
+
+
+def parse_lines(text: str):
+    if text.startswith("No birthdays"):
+        return {}
+    lines = {}
+    for line in text.splitlines():
+        label, _separator, names = line.partition(": ")
+        assert label not in lines
+        lines[label] = set(names.split(","))
+    return lines
+
+
+# birthdays of 1990 and 1991 only: for 29 February the replaced functions took 1 March of every next year
+USERS = [
+    {"name": f"User{number}", "birthday": datetime(1990, 1, 1) + timedelta(days=number * 3)}
+    for number in range(122)
+]
+
+
+@pytest.mark.parametrize("today", TODAYS[::3], ids=str)
+def test_calendar_agrees_with_replaced_functions(today):
+    calendar = users_calendar(USERS)
+    assert parse_lines(calendar.next_week(today)) == baseline_lines(USERS, today, 7, "%A")
+    for days in (1, 30, 200):
+        assert parse_lines(calendar.next_days(days, today)) == baseline_lines(USERS, today, days, "%d %B")
+    today_names = baseline_lines(USERS, today, 1, "%d").get(f"{today:%d}", set())
+    expected = f"Don't forget to congratulate: {', '.join(sorted(today_names))}" if today_names else "Today there is no birthdays"
+    assert calendar.today(today) == expected
+
+
+def test_calendar_lines_are_sorted_by_date_and_name():
+    users = [
+        {"name": "Bob", "birthday": datetime(1990, 3, 16)},
+        {"name": "Ann", "birthday": datetime(1991, 3, 17)},
+        {"name": "Cid", "birthday": datetime(1992, 3, 14)},
+    ]
+    # 14 March 2024 is Thursday, 16 and 17 March are greeted on Monday 18 March
+    assert users_calendar(users).next_week(date(2024, 3, 14)) == "Thursday: Cid\nMonday: Ann,Bob"
+
+
+def test_calendar_is_recomputed_after_changes():
+    index = make_index()
+    calendar = BirthdayCalendar(index, vectorized=False)
+    today = date(2024, 3, 14)
+    assert [name for _day, name in calendar.window(1, today=today)] == ["03-14"]
+    index.set("Bob", date(1990, 3, 14))
+    assert [name for _day, name in calendar.window(1, today=today)] == ["03-14", "Bob"]
+    # 16 and 17 March 2024 are greeted on Monday 18 March, 4 days from today
+    assert calendar.window(2, start=1, today=today) == [(date(2024, 3, 15), "03-15")]
+
+
+@pytest.mark.parametrize("today", TODAYS, ids=str)
+def test_vectorized_calendar_agrees_with_index_walk(today):
+    pytest.importorskip("numpy")
+    index = make_index()
+    # a removed birthday leaves a free slot the vectorized path has to skip
+    index.set("Gone", date(1990, 6, 1))
+    index.set("Gone", None)
+    vectorized = BirthdayCalendar(index, vectorized=True)
+    walked = BirthdayCalendar(index, vectorized=False)
+    assert vectorized.vectorized
+    for days in WINDOWS:
+        assert vectorized.window(days, today=today) == walked.window(days, today=today)
@@ -0,0 +1,86 @@
+import json
+import pytest
+from console_bot.address_book import AddressBook, Record, build_records
+
+RECORDS = [
+    {
+        "name": "Ann",
+        "birthday": "21.03.1993",
+        "phones": ["0123456789", "0987654321"],
+        "emails": ["ann@example.com"],
+        "addresses": ["Kyiv, Khreshchatyk 1"],
+    },
+    {"name": "Тарас", "birthday": "", "phones": [], "emails": [], "addresses": ["Львів"]},
+]
+
+
+def make_book():
+    return AddressBook.from_dict({record_data["name"]: record_data for record_data in RECORDS})
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_export_import_round_trip(tmp_path, extension):
+    filename = str(tmp_path / f"contacts.{extension}")
+    book = make_book()
+    assert book.export_file(filename) == 2
+
+    imported = AddressBook()
+    assert imported.import_file(filename) == (2, 0)
+    assert imported.to_dict() == book.to_dict()
+
+
+def test_import_drops_invalid_values(tmp_path):
+    filename = tmp_path / "contacts.jsonl"
+    lines = [
+        {"name": "Ann", "phones": ["0123456789", "12345"], "emails": ["bad"], "birthday": "31.02.1990"},
+        {"name": "", "phones": ["0123456789"]},
+        {"name": "Bob", "birthday": "01.01.1990"},
+    ]
+    filename.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    book = AddressBook()
+    assert book.import_file(str(filename)) == (2, 4)
+    assert book["Ann"].to_dict() == {
+        "name": "Ann", "birthday": "", "phones": ["0123456789"], "emails": [], "addresses": []
+    }
+    assert book["Bob"].birthday.value.year == 1990
+
+
+def test_build_records_matches_from_dict():
+    records, rejected = build_records([dict(record_data) for record_data in RECORDS])
+    assert rejected == 0
+    assert [record.to_dict() for record in records] == [
+        Record.from_dict(record_data).to_dict() for record_data in RECORDS
+    ]
+
+
+def test_import_fills_empty_fields_of_existing_contact(tmp_path):
+    book = AddressBook()
+    existing = Record("Ann")
+    existing.add_phone("0123456789")
+    book.add_contact(existing)
+    filename = tmp_path / "contacts.jsonl"
+    filename.write_text(json.dumps({
+        "name": "Ann",
+        "birthday": "21.03.1993",
+        "phones": ["0123456789", "0987654321"],
+        "emails": ["ann@example.com"],
+    }))
+    book.import_file(str(filename))
+    assert book["Ann"].to_dict() == {
+        "name": "Ann",
+        "birthday": "21.03.1993",
+        "phones": ["0123456789", "0987654321"],
+        "emails": ["ann@example.com"],
+        "addresses": [],
+    }
+
+
+def test_import_keeps_existing_birthday(tmp_path):
+    book = AddressBook()
+    existing = Record("Ann")
+    existing.add_birthday("01.01.1990")
+    book.add_contact(existing)
+    filename = tmp_path / "contacts.jsonl"
+    filename.write_text(json.dumps({"name": "Ann", "birthday": "21.03.1993"}))
+    book.import_file(str(filename))
+    assert book["Ann"].to_dict()["birthday"] == "01.01.1990"
@@ -0,0 +1,65 @@
+import random
+import pytest
+from console_bot.fuzzy import NameTree, edit_distance, typo_distance
+
+
+def levenshtein(first, second):
+    """Plain dynamic programming over the whole distance matrix"""
+    rows = [[i + j if i == 0 or j == 0 else 0 for j in range(len(second) + 1)] for i in range(len(first) + 1)]
+    for i in range(1, len(first) + 1):
+        for j in range(1, len(second) + 1):
+            rows[i][j] = min(
+                rows[i - 1][j] + 1,
+                rows[i][j - 1] + 1,
+                rows[i - 1][j - 1] + (first[i - 1] != second[j - 1]),
+            )
+    return rows[-1][-1]
+
+
+def random_words(seed, count, alphabet="abcдеї", max_length=12):
+    generator = random.Random(seed)
+    return ["".join(generator.choices(alphabet, k=generator.randint(0, max_length))) for _ in range(count)]
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [("", ""), ("", "abc"), ("abc", ""), ("kitten", "sitting"), ("Олена", "Олєна"), ("a" * 70, "a" * 69 + "b")],
+)
+def test_edit_distance_examples(first, second):
+    assert edit_distance(first, second) == levenshtein(first, second)
+
+
+def test_edit_distance_agrees_with_dynamic_programming():
+    first_words, second_words = random_words(1, 300), random_words(2, 300)
+    for first, second in zip(first_words, second_words):
+        assert edit_distance(first, second) == levenshtein(first, second), (first, second)
+
+
+def test_typo_distance_counts_swap_as_one_typo():
+    assert typo_distance("maria", "mraia") == 1
+    assert levenshtein("maria", "mraia") == 2
+    assert typo_distance("anna", "anna") == 0
+
+
+def test_name_tree_agrees_with_brute_force():
+    names = sorted(set(random_words(3, 400, alphabet="abcde", max_length=7)) - {""})
+    tree = NameTree(names)
+    removed = set(names[::3])
+    for name in removed:
+        tree.remove(name)
+    kept = [name for name in names if name not in removed]
+    for query in random_words(4, 50, alphabet="abcdeX", max_length=7):
+        for max_distance in (1, 2):
+            expected = {name for name in kept if levenshtein(query, name) <= max_distance}
+            assert set(tree.closest(query, max_distance)) == expected
+
+
+def test_name_tree_ignores_case_and_orders_by_typos():
+    tree = NameTree(["Maria", "Mario", "Marta", "Ivan"])
+    # all three names are two edits away, but the swapped letters of "Maria" are one typo
+    assert tree.closest("marai", 2) == ["Maria", "Mario", "Marta"]
+    assert tree.closest("MARIO", 0) == ["Mario"]
+    tree.remove("Mario")
+    assert tree.closest("MARIO", 0) == []
+    tree.add("Mario")
+    assert tree.closest("MARIO", 0) == ["Mario"]
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+import json
+import pytest
+from console_bot.address_book import AddressBook, Record, greeting_filename
+
+# Thursday
+TODAY = date(2024, 3, 14)
+
+
+@pytest.fixture
+def filename(tmp_path):
+    filename = tmp_path / "address_book.json"
+    filename.write_text(json.dumps({"Ann": record_data("Ann", "14.03.1990"), "Bob": record_data("Bob", "15.03.1990")}))
+    return str(filename)
+
+
+def record_data(name, birthday):
+    return {"name": name, "birthday": birthday, "phones": [], "emails": [], "addresses": []}
+
+
+def greet(filename, today=TODAY, storage="json"):
+    book = AddressBook.load_from_file(filename, storage=storage)
+    return book, book.today_greeting(filename, today)
+
+
+def test_greeting_is_read_from_cache_without_building_index(filename):
+    book, greeting = greet(filename)
+    assert greeting == "Don't forget to congratulate: Ann"
+    assert book._birthday_index is not None
+    book, greeting = greet(filename)
+    assert greeting == "Don't forget to congratulate: Ann"
+    assert book._birthday_index is None
+
+
+def test_cache_of_changed_file_is_not_used(filename):
+    greet(filename)
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump({"Ann": record_data("Ann", "14.03.1990"), "Cid": record_data("Cid", "14.03.1991")}, file)
+    book, greeting = greet(filename)
+    assert greeting == "Don't forget to congratulate: Ann, Cid"
+    assert book._birthday_index is not None
+
+
+def test_cache_of_other_day_is_not_used(filename):
+    greet(filename)
+    _book, greeting = greet(filename, TODAY + timedelta(days=1))
+    assert greeting == "Don't forget to congratulate: Bob"
+
+
+def test_unsaved_changes_are_greeted_but_not_cached(filename):
+    greet(filename)
+    with open(greeting_filename(filename), encoding="utf-8") as file:
+        cached = file.read()
+    book = AddressBook.load_from_file(filename, storage="json")
+    record = Record("Cid")
+    record.add_birthday("14.03.1991")
+    book.add_contact(record)
+    assert book.today_greeting(filename, TODAY) == "Don't forget to congratulate: Ann, Cid"
+    with open(greeting_filename(filename), encoding="utf-8") as file:
+        assert file.read() == cached
+
+
+@pytest.mark.parametrize("storage", ["json", "journal", "sqlite", "binary", "sharded"])
+def test_saved_changes_invalidate_cache(filename, storage):
+    book, greeting = greet(filename, storage=storage)
+    assert greeting == "Don't forget to congratulate: Ann"
+    record = Record("Cid")
+    record.add_birthday("14.03.1991")
+    book.add_contact(record)
+    book.save_to_file(filename)
+    book, greeting = greet(filename, storage=storage)
+    assert greeting == "Don't forget to congratulate: Ann, Cid"
+    book, greeting = greet(filename, storage=storage)
+    assert greeting == "Don't forget to congratulate: Ann, Cid"
+    assert book._birthday_index is None
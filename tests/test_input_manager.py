@@ -0,0 +1,41 @@
+import pytest
+from console_bot.address_book import Record
+from console_bot.input_manager import InputManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("console_bot.input_manager.SEARCH_PAGE_SIZE", 2)
+    manager = InputManager()
+    for number in range(5):
+        record = Record(f"Ann{number}")
+        record.add_phone(f"050111223{number}")
+        record.add_birthday(f"0{number + 1}.01.1990")
+        manager.book.add_contact(record)
+    return manager
+
+
+def test_search_pages(manager):
+    first = str(manager.full_search(["050"]))
+    assert "Ann0" in first and "Ann1" in first and "Ann2" not in first
+    assert "Next page: search 050 --page 2" in first
+    third = str(manager.full_search(["050", "--page", "3"]))
+    assert "Ann4" in third and "Ann3" not in third and "Next page" not in third
+
+
+def test_trailing_number_is_searched_not_taken_as_page(manager):
+    result = str(manager.full_search(["1990", "7"]))
+    assert "Nothing found" in result
+    assert "Ann0" in str(manager.full_search(["1990", "--page", "1"]))
+
+
+@pytest.mark.parametrize("args", [["050", "--page"], ["050", "--page", "x"], ["050", "--page", "0"], ["--page", "2"]])
+def test_invalid_page(manager, args):
+    assert manager.full_search(args) == "Invalid input. Please provide valid arguments."
+
+
+def test_invalid_regular_expression_is_reported(manager):
+    assert manager.full_search(["re:("]) == (
+        "Invalid regular expression (: missing ), unterminated subpattern at position 0"
+    )
@@ -0,0 +1,163 @@
+import math
+import pytest
+from console_bot.note import Note, NoteBook
+from console_bot.note_index import TrigramIndex, note_terms
+from console_bot.search_index import words
+
+NOTES = [
+    ("Buy milk and bread", ["shopping", "home"]),
+    ("Homework for Monday", ["school", "homework"]),
+    ("Call Mom", None),
+    ("Київ, вулиця Хрещатик", ["travel"]),
+    ("milk\nsecond line", ["shopping"]),
+]
+KEYWORDS = ["milk", "mi", "M", "ework", "Хрещ", "line\n", "nothing", "Buy milk and bread!", ""]
+
+
+def make_notebook():
+    note_book = NoteBook()
+    for value, tags in NOTES:
+        note_book.add_note(Note(value, list(tags) if tags else tags))
+    return note_book
+
+
+def scan(note_book, keyword):
+    """Answer of find-notes computed by checking every note"""
+    return "\n".join(
+        f"{index + 1}: {note}"
+        for index, note in enumerate(note for note in note_book.data if keyword in note.value)
+    )
+
+
+@pytest.mark.parametrize("keyword", KEYWORDS)
+def test_find_notes_agrees_with_scan(keyword):
+    note_book = make_notebook()
+    assert note_book.find_notes(keyword, folded=False) == scan(note_book, keyword)
+
+
+def test_find_notes_follows_changes():
+    note_book = make_notebook()
+    note_book.find_notes("milk", folded=False)
+    note_book.edit_note(0, "Buy bread", "", "skip_tags")
+    note_book.delete_note(1)
+    note_book.add_note(Note("Oat milk"))
+    for keyword in KEYWORDS:
+        assert note_book.find_notes(keyword, folded=False) == scan(note_book, keyword)
+
+
+def test_saved_index_is_loaded(tmp_path):
+    filename = str(tmp_path / "note_book.json")
+    note_book = make_notebook()
+    note_book.find_notes("milk", folded=False)
+    note_book.save_to_file(filename)
+    loaded = NoteBook.load_from_file(filename, storage="json")
+    assert isinstance(loaded._trigram_indexes[False], TrigramIndex)
+    for keyword in KEYWORDS:
+        assert loaded.find_notes(keyword, folded=False) == scan(note_book, keyword)
+
+
+def test_outdated_index_is_not_loaded(tmp_path):
+    filename = str(tmp_path / "note_book.json")
+    note_book = make_notebook()
+    note_book.find_notes("milk", folded=False)
+    note_book.save_to_file(filename)
+    with open(filename, "a", encoding="utf-8") as file:
+        file.write(" ")
+    loaded = NoteBook.load_from_file(filename, storage="json")
+    assert False not in loaded._trigram_indexes
+
+
+def tag_scan(note_book, tag):
+    """Answer of find-notes-by-tag computed by checking tags of every note"""
+    return "\n".join(
+        f"{index + 1}: {note}"
+        for index, note in enumerate(note for note in note_book.data if note.has_tag(tag))
+    )
+
+
+@pytest.mark.parametrize("tag", ["shopping", "home", "work", "o", "travel", "missing"])
+def test_find_notes_by_tag_agrees_with_scan(tag):
+    note_book = make_notebook()
+    assert note_book.find_notes_by_tag(tag) == tag_scan(note_book, tag)
+
+
+def test_tag_index_follows_changes():
+    note_book = make_notebook()
+    note_book.find_notes_by_tag("shopping")
+    note_book.add_tag(2, "family")
+    note_book.remove_tag(0, "shopping")
+    note_book.delete_note(1)
+    note_book.edit_note(3, "", "shopping,food", "skip_description")
+    note_book.add_note(Note("Pay rent", ["home"]))
+    for tag in ["shopping", "home", "family", "food", "work", "o"]:
+        assert note_book.find_notes_by_tag(tag) == tag_scan(note_book, tag)
+
+
+def test_sort_notes_by_tag_puts_tagged_notes_first():
+    note_book = make_notebook()
+    values = [note.value for note in note_book.sort_notes_by_tag("shopping")]
+    assert values == [
+        "Buy milk and bread",
+        "milk\nsecond line",
+        "Homework for Monday",
+        "Call Mom",
+        "Київ, вулиця Хрещатик",
+    ]
+
+
+def test_folded_find_notes_keeps_cyrillic_letters_apart():
+    note_book = NoteBook()
+    note_book.add_note(Note("Зустріч з Йосипом у кафе"))
+    note_book.add_note(Note("Иосиф, CAFÉ"))
+    assert note_book.find_notes("йосип", folded=True) == "1: Зустріч з Йосипом у кафе"
+    assert note_book.find_notes("cafe", folded=True) == "1: Иосиф, CAFÉ"
+
+
+def test_index_of_other_version_is_not_loaded(tmp_path, monkeypatch):
+    filename = str(tmp_path / "note_book.json")
+    note_book = make_notebook()
+    note_book.find_notes("milk", folded=True)
+    note_book.save_to_file(filename)
+    assert True in NoteBook.load_from_file(filename, storage="json")._trigram_indexes
+    monkeypatch.setattr("console_bot.note_index.INDEX_VERSION", 0)
+    assert True not in NoteBook.load_from_file(filename, storage="json")._trigram_indexes
+
+
+def bm25_scores(notes, query, k1=1.2, b=0.75):
+    """BM25 scores of all notes computed from scratch"""
+    documents = [note_terms(note) for note in notes]
+    average_length = sum(map(len, documents)) / len(documents)
+    scores = [0.0] * len(notes)
+    for term in set(words(query.casefold())):
+        frequency_in_notes = sum(term in document for document in documents)
+        if not frequency_in_notes:
+            continue
+        idf = math.log(1 + (len(notes) - frequency_in_notes + 0.5) / (frequency_in_notes + 0.5))
+        for position, document in enumerate(documents):
+            frequency = document.count(term)
+            norm = k1 * (1 - b + b * len(document) / average_length)
+            scores[position] += idf * frequency * (k1 + 1) / (frequency + norm)
+    return scores
+
+
+def top_by_bm25(notes, query, k):
+    scores = bm25_scores(notes, query)
+    ranked = sorted((position for position, score in enumerate(scores) if score > 0), key=lambda p: (-scores[p], p))
+    return [(position, notes[position]) for position in ranked[:k]]
+
+
+@pytest.mark.parametrize("query", ["milk", "Milk bread", "home shopping", "homework monday", "київ", "absent"])
+def test_top_notes_agree_with_bm25_from_scratch(query):
+    note_book = make_notebook()
+    assert note_book.rank_index().top(query, 3) == top_by_bm25(note_book.data, query, 3)
+
+
+def test_rank_index_follows_changes():
+    note_book = make_notebook()
+    note_book.rank_index()
+    note_book.add_note(Note("milk milk milk", ["shopping"]))
+    note_book.delete_note(1)
+    note_book.edit_note(0, "Buy bread", "", "skip_tags")
+    note_book.add_tag(1, "milk")
+    for query in ["milk", "bread shopping", "mom"]:
+        assert note_book.rank_index().top(query, 10) == top_by_bm25(note_book.data, query, 10)
@@ -0,0 +1,103 @@
+import random
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.query import is_query, parse
+
+FIRST_NAMES = ["John", "Johanna", "Maria", "Olena", "Taras", "Ivan"]
+DOMAINS = ["gmail.com", "ukr.net", "example.com"]
+CITIES = ["Kyiv", "Lviv", "Odesa", "Kharkiv"]
+QUERIES = [
+    "name:Jo*",
+    "name:john",
+    "email:gmail.com",
+    "email:gmail*",
+    "birthday:03",
+    "birthday:15.03",
+    "birthday:1990",
+    "Kyiv",
+    "name:Jo* email:gmail.com",
+    "name:Jo* AND NOT address:Kyiv",
+    "name:Maria OR name:Olena",
+    "(name:Maria OR name:Olena) birthday:1990",
+    "NOT (email:ukr.net OR birthday:03)",
+    "NOT NOT name:Ivan",
+    "phone:050* OR address:Lviv email:example.com",
+]
+
+
+def make_book(count=200):
+    generator = random.Random(5)
+    book = AddressBook()
+    for number in range(count):
+        first_name = generator.choice(FIRST_NAMES)
+        record = Record(f"{first_name}{number}" if number % 2 else f"{first_name} Smith{number}")
+        record.add_phone(generator.choice(["050", "067", "093"]) + f"{number:07d}")
+        if generator.random() < 0.7:
+            record.add_email(f"{first_name.lower()}{number}@{generator.choice(DOMAINS)}")
+        if generator.random() < 0.6:
+            record.add_address(f"{generator.choice(CITIES)}, Street {number}")
+        if generator.random() < 0.8:
+            day, month = generator.choice([(15, 3), (1, 3), (20, 7), (29, 2)])
+            record.add_birthday(f"{day:02d}.{month:02d}.{generator.choice([1990, 1992, 2000])}")
+        book.add_contact(record)
+    return book
+
+
+def contact(book, key):
+    record = book[key]
+    return {
+        "name": record.name.value.split(),
+        "email": [email.value for email in record.emails],
+        "phone": [phone.value for phone in record.phones],
+        "address": [address.value.split(",")[0] for address in record.addresses],
+        "birthday": record.birthday.value if record.birthday and record.birthday.value else None,
+    }
+
+
+EXPECTED = {
+    "name:Jo*": lambda c: c["name"][0].startswith("Jo"),
+    "email:gmail.com": lambda c: any(email.endswith("@gmail.com") for email in c["email"]),
+    "birthday:03": lambda c: c["birthday"] is not None and c["birthday"].month == 3,
+    "birthday:15.03": lambda c: c["birthday"] is not None and (c["birthday"].day, c["birthday"].month) == (15, 3),
+    "birthday:1990": lambda c: c["birthday"] is not None and c["birthday"].year == 1990,
+    # without * a name word must be equal to the value, so "Maria5" doesn't match but "Maria Smith4" does
+    "(name:Maria OR name:Olena) birthday:1990": lambda c: any(name in ("Maria", "Olena") for name in c["name"])
+    and c["birthday"] is not None
+    and c["birthday"].year == 1990,
+    "NOT (email:ukr.net OR birthday:03)": lambda c: not any(email.endswith("@ukr.net") for email in c["email"])
+    and not (c["birthday"] is not None and c["birthday"].month == 3),
+}
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_indexed_evaluation_agrees_with_checking_every_record(query):
+    book = make_book()
+    index = book.search_index()
+    tree = parse(query)
+    assert tree.evaluate(index) == {key for key in index.keys() if tree.matches(index, key)}
+
+
+@pytest.mark.parametrize("query", EXPECTED)
+def test_query_results(query):
+    book = make_book()
+    found = set(book.find_all(query).keys)
+    assert found == {key for key in book if EXPECTED[query](contact(book, key))}
+    assert found
+
+
+def test_query_results_are_paged_in_name_order():
+    book = make_book()
+    first = book.find_all("name:Jo*", limit=10)
+    second = book.find_all("name:Jo*", limit=10, offset=10)
+    assert first.keys + second.keys == sorted(book.find_all("name:Jo*").keys)[:20]
+
+
+@pytest.mark.parametrize("term, expected", [("name:Jo", True), ("a OR b", True), ("John Smith", False), ("re:a|b", False)])
+def test_is_query(term, expected):
+    assert is_query(term) == expected
+
+
+@pytest.mark.parametrize("query", ["name:", "(name:Jo", "name:Jo)", "AND name:Jo", "NOT", "name:Jo OR"])
+def test_malformed_queries(query):
+    with pytest.raises(ValueError):
+        parse(query)
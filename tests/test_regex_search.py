@@ -0,0 +1,74 @@
+import re
+import threading
+import time
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.search_index import RegexScanMatches, field_texts
+from console_bot.storage import WriteBehindFlusher
+
+CATASTROPHIC = ["((a+))+b", "(?:(a+))+b", "(a|a)*b", "(a|aa)+b", "(a+)+b"]
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    for number in range(600):
+        record = Record(f"{'a' * 26}c{number}")
+        record.add_phone(f"{number:010d}")
+        if number % 3 == 0:
+            record.add_email(f"user{number}@example.com")
+        book.add_contact(record)
+    return book
+
+
+@pytest.mark.parametrize("pattern", [r"^00000001", r"example\.com$", r"c5\d\d$", r"(\d{3}-)+", "nothing"])
+def test_regex_search_agrees_with_scan_in_process(book, pattern):
+    search = re.compile(pattern).search
+    expected = [
+        key for key, record in book.items() if any(search(text) for text in field_texts(record).values())
+    ]
+    result = book.find_all(f"re:{pattern}")
+    assert not result.timed_out
+    assert result.keys == expected
+    assert book.find_all(f"re:{pattern}", limit=5, offset=5).keys == expected[5:10]
+
+
+@pytest.mark.parametrize("pattern", CATASTROPHIC)
+def test_catastrophic_pattern_stops_within_budget(book, pattern, monkeypatch):
+    monkeypatch.setattr("console_bot.address_book.SEARCH_TIME_BUDGET", 0.5)
+    started = time.monotonic()
+    result = book.find_all(f"re:{pattern}")
+    assert time.monotonic() - started < 3
+    assert result.timed_out
+    assert "results may be incomplete" in str(result)
+    # the stuck worker is replaced for the next search
+    assert book.find_all("re:^00000001$").keys == []
+    assert book.find_all("re:^0000000001$").keys == [f"{'a' * 26}c1"]
+
+
+def test_invalid_pattern_raises_value_error(book):
+    with pytest.raises(ValueError):
+        book.find_all("re:(")
+
+
+def test_flusher_saves_while_search_waits(book, monkeypatch):
+    monkeypatch.setattr("console_bot.address_book.SEARCH_TIME_BUDGET", 1.0)
+    saved = threading.Event()
+    flusher = WriteBehindFlusher(saved.set, interval=0.05).start()
+    try:
+        with flusher.lock:
+            result = book.find_all("re:(a|aa)+b", unlocked=flusher.unlocked)
+            # the lock is held again after the search
+            assert flusher.lock._is_owned()
+        assert result.timed_out
+        assert saved.is_set()
+    finally:
+        flusher.stop()
+
+
+def test_page_filled_early_keeps_worker(book):
+    book.find_all("re:a", limit=1)
+    pool = RegexScanMatches._pool
+    assert pool is not None
+    book.find_all("re:a", limit=1)
+    assert RegexScanMatches._pool is pool
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, time
+import threading
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.console_bot import read_commands
+from console_bot.reminders import ReminderScheduler
+from console_bot.storage import WriteBehindFlusher
+
+# Thursday
+MORNING = datetime(2024, 3, 14, 8, 0)
+AFTERNOON = datetime(2024, 3, 14, 15, 0)
+AT = time(9, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def add(book, name, birthday):
+    record = Record(name)
+    record.add_birthday(birthday)
+    book.add_contact(record)
+    return record
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    add(book, "Ann", "14.03.1990")
+    add(book, "Bob", "15.03.1990")
+    return book
+
+
+def scheduler(book, now):
+    scheduler = ReminderScheduler(book, print, at=AT, clock=Clock(now))
+    scheduler.build()
+    book.subscribe(scheduler.record_changed)
+    return scheduler
+
+
+def test_birthday_greeted_on_start_is_not_reminded_again(book):
+    reminders = scheduler(book, MORNING)
+    assert reminders.due(datetime(2024, 3, 14, 9, 0)) == []
+    assert reminders.due(datetime(2024, 3, 15, 9, 0)) == ["Bob"]
+    assert reminders._due["Ann"] == datetime(2025, 3, 14, 9, 0)
+
+
+def test_change_not_touching_birthday_is_not_reminded(book):
+    reminders = scheduler(book, MORNING)
+    reminders.clock.now = AFTERNOON
+    book["Ann"].add_phone("0123456789")
+    book.mark_changed("Ann")
+    book["Ann"].add_birthday("14.03.1990")
+    book.mark_changed("Ann")
+    assert reminders.due(AFTERNOON) == []
+
+
+def test_birthday_set_today_after_reminder_time_is_reminded_once(book):
+    reminders = scheduler(book, MORNING)
+    reminders.clock.now = AFTERNOON
+    add(book, "Cid", "14.03.1991")
+    assert reminders.due(AFTERNOON) == ["Cid"]
+    book["Cid"].add_birthday("15.03.1991")
+    book.mark_changed("Cid")
+    book["Cid"].add_birthday("14.03.1991")
+    book.mark_changed("Cid")
+    assert reminders.due(AFTERNOON) == []
+    assert reminders._due["Cid"] == datetime(2025, 3, 14, 9, 0)
+
+
+def test_changed_birthday_is_rescheduled(book):
+    reminders = scheduler(book, MORNING)
+    book["Bob"].add_birthday("18.03.1990")
+    book.mark_changed("Bob")
+    assert reminders.due(datetime(2024, 3, 15, 9, 0)) == []
+    # Monday
+    assert reminders.due(datetime(2024, 3, 18, 9, 0)) == ["Bob"]
+
+
+def test_deleted_contact_is_not_reminded(book):
+    reminders = scheduler(book, MORNING)
+    book.delete("Bob")
+    assert reminders.due(datetime(2024, 3, 15, 9, 0)) == []
+    assert "Bob" not in reminders._due
+
+
+def test_run_unsubscribes_when_cancelled(book):
+    async def run():
+        task = asyncio.create_task(ReminderScheduler(book, print, at=AT, clock=Clock(MORNING)).run())
+        await asyncio.sleep(0)
+        assert len(book._observers) == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert book._observers == []
+
+
+def test_run_builds_holding_lock_without_blocking_loop(book):
+    lock = threading.RLock()
+
+    async def run():
+        reminders = ReminderScheduler(book, print, at=AT, clock=Clock(MORNING))
+        with lock:
+            task = asyncio.create_task(reminders.run(lock))
+            # the loop keeps running while the build waits for the lock
+            await asyncio.sleep(0.05)
+            assert reminders._due == {}
+        for _attempt in range(100):
+            if reminders._due:
+                break
+            await asyncio.sleep(0.01)
+        assert reminders._due == {
+            "Ann": datetime(2025, 3, 14, 9, 0),
+            "Bob": datetime(2024, 3, 15, 9, 0),
+        }
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert book._observers == []
+
+
+class Session:
+    def __init__(self, answers):
+        self.answers = answers
+
+    async def prompt_async(self, message, **kwargs):
+        if not self.answers:
+            raise EOFError
+        return self.answers.pop(0)
+
+
+class Manager:
+    def __init__(self, book):
+        self.book = book
+        self.notes = []
+
+    def parse_input(self, user_input):
+        return user_input.split()
+
+    def add_note(self, note, tags):
+        self.notes.append((note, tags))
+        return "Note added"
+
+
+def test_ctrl_d_exits_and_stops_reminders(book, monkeypatch):
+    monkeypatch.setattr("console_bot.console_bot.REMINDERS", True)
+    manager = Manager(book)
+    flusher = WriteBehindFlusher(lambda: None, interval=60)
+    asyncio.run(read_commands(manager, Session(["add-note", "buy milk", "home"]), flusher))
+    assert manager.notes == [("buy milk", "home")]
+    assert book._observers == []
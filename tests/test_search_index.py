@@ -0,0 +1,115 @@
+import re
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.search_index import TokenIndex, field_texts, fold, strip_accents
+
+CONTACTS = [
+    ("John", ["0501112233"], ["john.smith@gmail.com"], ["Kyiv, Khreshchatyk 1"], "21.03.1993"),
+    ("Johanna", ["0671112233"], ["jo@ukr.net"], ["Lviv, Rynok 5"], "01.12.1990"),
+    ("Anna-Maria", ["0509998877", "0931234567"], [], ["Odesa"], ""),
+    ("Ohnesorg", [], ["ohne@sorg.de"], [], "29.02.1992"),
+    ("Тарас", ["0445556677"], ["taras@kobzar.ua"], ["Київ, вул. Шевченка 12"], "09.03.1994"),
+]
+TERMS = ["Jo", "John", "ohn", "Ohn", "050", "2233", "gmail", "smith", "Kyiv", "Ky", "Київ", "12", "03", "March", "1992", "Maria", "zzz"]
+
+
+def make_book():
+    book = AddressBook()
+    for name, phones, emails, addresses, birthday in CONTACTS:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        for email in emails:
+            record.add_email(email)
+        for address in addresses:
+            record.add_address(address)
+        if birthday:
+            record.add_birthday(birthday)
+        book.add_contact(record)
+    return book
+
+
+def regex_matches(book, term, exclude):
+    """Records matched by the baseline regex anchored at the beginning of a word"""
+    pattern = re.compile(r"(?<!\w)" + re.escape(term))
+    return sorted(
+        key
+        for key, record in book.items()
+        if key != exclude and any(pattern.search(text) for text in field_texts(record).values())
+    )
+
+
+@pytest.mark.parametrize("term", TERMS)
+def test_word_search_agrees_with_regex_at_word_start(term):
+    book = make_book()
+    result = book.find_all(term)
+    assert result.keys == regex_matches(book, term, result.name_match)
+
+
+def test_word_search_does_not_find_text_inside_words():
+    book = make_book()
+    assert book.find_all("ohn").keys == ["Ohnesorg"]
+    assert book.find_all("re:ohn").keys == ["John", "Ohnesorg"]
+
+
+def test_index_updates_agree_with_rebuilt_index():
+    book = make_book()
+    index = book.search_index()
+    record = Record("Joseph")
+    record.add_phone("0501234567")
+    book.add_contact(record)
+    book.delete("John")
+    book.add_email("Johanna", "johanna@example.com")
+    rebuilt = TokenIndex.build(book.items())
+    for field in ("name", "phone", "email"):
+        assert list(index.prefix_items(field, "")) == list(rebuilt.prefix_items(field, ""))
+
+
+def test_token_added_and_removed_before_lookup():
+    index = TokenIndex()
+    record = Record("Ann")
+    index.update("Ann", record)
+    index.update("Ann", None)
+    index.update("Bob", Record("Bob"))
+    assert list(index.prefix_items("name", "")) == [("Bob", {"Bob"})]
+    index.update("Bob", None)
+    assert list(index.prefix_items("name", "")) == []
+
+
+@pytest.mark.parametrize(
+    "text, folded",
+    [
+        ("Café", "cafe"),
+        ("NAÏVE", "naive"),
+        ("Йосип", "йосип"),
+        ("ЇЖАК", "їжак"),
+        ("Ёлка", "ёлка"),
+        ("Straße", "strasse"),
+        ("ﬁle", "file"),
+    ],
+)
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+def test_fold_keeps_cyrillic_letters_apart():
+    assert fold("Йосип") != fold("Иосип")
+    assert fold("їжак") != fold("іжак")
+    assert strip_accents("Йосип Café") == "Йосип Cafe"
+
+
+def test_folded_search_reports_only_whole_name_as_name_match():
+    book = make_book()
+    result = book.find_all("maria", folded=True)
+    assert result.name_match is None
+    assert result.keys == ["Anna-Maria"]
+    assert book.find_all("anna-MARIA", folded=True).name_match == "Anna-Maria"
+
+
+def test_folded_search_tells_й_from_и():
+    book = make_book()
+    for name in ("Йосип", "Иосиф"):
+        book.add_contact(Record(name))
+    assert book.find_all("йосип", folded=True).name_match == "Йосип"
+    assert book.find_all("ЙОС", folded=True).keys == ["Йосип"]
+    assert book.find_all("ио", folded=True).keys == ["Иосиф"]
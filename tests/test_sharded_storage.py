@@ -0,0 +1,64 @@
+import json
+import os
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.sharded_storage import ShardedRecordStore, shard_of
+
+NAMES = ["Ann", "Andrew", "Bob", "Тарас", "Olena", "Oleh", "Zed"]
+
+
+def record_data(name):
+    return {"name": name, "birthday": "", "phones": ["0123456789"], "emails": [], "addresses": []}
+
+
+@pytest.fixture
+def filename(tmp_path):
+    filename = tmp_path / "address_book.json"
+    filename.write_text(
+        json.dumps({name: record_data(name) for name in NAMES}, ensure_ascii=False), encoding="utf-8"
+    )
+    return str(filename)
+
+
+def shards_directory(filename):
+    return filename[: -len(".json")] + ".shards"
+
+
+@pytest.mark.parametrize("partition", ["hash", "prefix"])
+def test_round_trip(filename, partition, monkeypatch):
+    monkeypatch.setattr("console_bot.address_book.SHARD_PARTITION", partition)
+    book = AddressBook.load_from_file(filename, storage="sharded")
+    assert sorted(book.keys()) == sorted(NAMES)
+    book.delete("Bob")
+    book.add_email("Ann", "ann@example.com")
+    book.add_contact(Record("Ivan"))
+    book.save_to_file(filename)
+
+    reopened = AddressBook.load_from_file(filename, storage="sharded")
+    assert sorted(reopened.keys()) == sorted(set(NAMES) - {"Bob"} | {"Ivan"})
+    assert reopened["Ann"].to_dict()["emails"] == ["ann@example.com"]
+    assert reopened.data.partition == partition
+
+
+def test_prefix_partition_keeps_first_letter_together():
+    assert shard_of("Olena", 16, "prefix") == shard_of("oleh", 16, "prefix")
+
+
+def test_only_changed_shard_is_written(filename):
+    book = AddressBook.load_from_file(filename, storage="sharded")
+    store = book.data
+    shards = {store._shard_of(name) for name in NAMES}
+    mtimes = {index: os.stat(store._filename(index)).st_mtime_ns for index in shards}
+    fingerprint = store.fingerprint()
+    book.add_email("Ann", "ann@example.com")
+    book.save_to_file(filename)
+    changed = {index for index in shards if os.stat(store._filename(index)).st_mtime_ns != mtimes[index]}
+    assert changed == {store._shard_of("Ann")}
+    assert store.fingerprint() != fingerprint
+
+
+def test_shard_is_read_on_first_access(filename):
+    AddressBook.load_from_file(filename, storage="sharded")
+    store = ShardedRecordStore(shards_directory(filename), Record.from_dict)
+    assert store["Zed"].name.value == "Zed"
+    assert list(store._loaded) == [store._shard_of("Zed")]
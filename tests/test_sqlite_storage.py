@@ -0,0 +1,85 @@
+import sqlite3
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.sqlite_storage import SQLiteRecordStore
+
+
+@pytest.fixture
+def filename(tmp_path):
+    return str(tmp_path / "address_book.json")
+
+
+def open_book(filename):
+    return AddressBook.load_from_file(filename, storage="sqlite")
+
+
+def make_record(name, phone):
+    record = Record(name)
+    record.add_phone(phone)
+    return record
+
+
+def test_round_trip(filename):
+    book = open_book(filename)
+    book.add_contact(make_record("Ann", "0123456789"))
+    book.add_contact(make_record("Bob", "0987654321"))
+    book.add_email("Ann", "ann@example.com")
+    book.add_address("Ann", "Kyiv")
+    book.delete("Bob")
+    book.save_to_file(filename)
+    book.data.close()
+
+    reopened = open_book(filename)
+    assert list(reopened.keys()) == ["Ann"]
+    assert reopened["Ann"].to_dict() == {
+        "name": "Ann",
+        "birthday": "",
+        "phones": ["0123456789"],
+        "emails": ["ann@example.com"],
+        "addresses": ["Kyiv"],
+    }
+    reopened.data.close()
+
+
+def test_set_record_is_written_once(filename, monkeypatch):
+    book = open_book(filename)
+    writes = []
+    monkeypatch.setattr(book.data, "write", lambda name, record_data: writes.append(name))
+    book.add_contact(make_record("Ann", "0123456789"))
+    assert writes == ["Ann"]
+    # a change in place is written by the observer
+    book.add_email("Ann", "ann@example.com")
+    assert writes == ["Ann", "Ann"]
+    book.data.close()
+
+
+def test_who_uses_phone_index(filename):
+    book = open_book(filename)
+    book.add_contact(make_record("Ann", "0501112233"))
+    book.add_contact(make_record("Bob", "0501119999"))
+    book.add_contact(make_record("Cid", "0671112233"))
+    book.save_to_file(filename)
+    book.data.close()
+
+    reopened = open_book(filename)
+    assert reopened.find_by_phone("050-111") == "0501112233: Ann\n0501119999: Bob"
+    # records are not read from the database
+    assert reopened.data._records == {}
+    plan = reopened.data.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT phone, name FROM phones WHERE phone >= ? AND phone < ?",
+        ("050", "050\uffff"),
+    ).fetchall()
+    assert "phones_phone" in str(plan)
+    reopened.data.close()
+
+
+def test_only_used_indexes_are_created(tmp_path):
+    store = SQLiteRecordStore(str(tmp_path / "address_book.db"), Record.from_dict)
+    indexes = {
+        name
+        for (name,) in store.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )
+    }
+    assert indexes == {"phones_name", "phones_phone", "emails_name", "addresses_name"}
+    store.close()
@@ -0,0 +1,258 @@
+from datetime import datetime
+import io
+import json
+import os
+import stat
+import threading
+import pytest
+from console_bot.address_book import AddressBook, Record
+from console_bot.note import Note, NoteBook
+from console_bot.storage import (
+    UMASK,
+    WriteBehindFlusher,
+    atomic_write,
+    dump_json_object,
+    iter_json_object,
+)
+
+
+def make_record(name, phone="0123456789", birthday=None):
+    record = Record(name)
+    record.add_phone(phone)
+    if birthday:
+        record.add_birthday(birthday)
+    return record
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    filename = tmp_path / "book.json"
+    filename.write_text("old")
+    with atomic_write(str(filename)) as file:
+        file.write("new")
+    assert filename.read_text() == "new"
+    assert os.listdir(tmp_path) == ["book.json"]
+
+
+def test_atomic_write_keeps_file_on_error(tmp_path):
+    filename = tmp_path / "book.json"
+    filename.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(filename)) as file:
+            file.write("half")
+            raise RuntimeError("crash")
+    assert filename.read_text() == "old"
+    assert os.listdir(tmp_path) == ["book.json"]
+
+
+def test_atomic_write_keeps_permissions(tmp_path):
+    filename = tmp_path / "book.json"
+    filename.write_text("old")
+    os.chmod(filename, 0o640)
+    with atomic_write(str(filename)) as file:
+        file.write("new")
+    assert stat.S_IMODE(os.stat(filename).st_mode) == 0o640
+
+
+def test_atomic_write_new_file_permissions_as_open(tmp_path):
+    filename = tmp_path / "book.json"
+    with atomic_write(str(filename)) as file:
+        file.write("new")
+    assert stat.S_IMODE(os.stat(filename).st_mode) == 0o666 & ~UMASK
+
+
+def test_dirty_until_saved(tmp_path):
+    filename = str(tmp_path / "address_book.json")
+    book = AddressBook.load_from_file(filename, storage="json")
+    assert not book.dirty
+    book.add_contact(make_record("Ann"))
+    assert book.dirty
+    book.save_to_file(filename)
+    assert not book.dirty
+
+
+def test_flusher_saves_changes_in_background():
+    saved = threading.Event()
+    flusher = WriteBehindFlusher(saved.set, interval=0.01).start()
+    try:
+        assert saved.wait(5)
+    finally:
+        flusher.stop()
+
+
+def test_flusher_keeps_running_after_failed_save():
+    calls = []
+    errors = []
+    recovered = threading.Event()
+
+    def save():
+        calls.append(None)
+        if len(calls) <= 3:
+            raise OSError("disk full")
+        recovered.set()
+
+    flusher = WriteBehindFlusher(save, interval=0.01, on_error=errors.append).start()
+    try:
+        assert recovered.wait(5)
+    finally:
+        flusher.stop()
+    # the same error is reported once
+    assert [str(error) for error in errors] == ["disk full"]
+
+
+def test_flusher_stop_raises_error_of_last_save():
+    def save():
+        raise OSError("read-only file system")
+
+    flusher = WriteBehindFlusher(save, interval=60, on_error=lambda error: None)
+    with pytest.raises(OSError):
+        flusher.stop()
+
+
+def open_journal_book(filename):
+    return AddressBook.load_from_file(filename, storage="journal", lazy=False)
+
+
+def test_journal_replays_changes_after_snapshot(tmp_path):
+    filename = str(tmp_path / "address_book.json")
+    book = open_journal_book(filename)
+    book.add_contact(make_record("Ann"))
+    book.save_to_file(filename)
+    book.add_contact(make_record("Bob", "1112223333"))
+    book.delete("Ann")
+    book.journal.close()
+
+    reopened = open_journal_book(filename)
+    assert sorted(reopened.keys()) == ["Bob"]
+    assert reopened["Bob"].phones[0].value == "1112223333"
+    reopened.journal.close()
+
+
+def test_journal_drops_torn_last_line(tmp_path):
+    filename = str(tmp_path / "address_book.json")
+    book = open_journal_book(filename)
+    book.save_to_file(filename)
+    book.add_contact(make_record("Ann"))
+    book.add_contact(make_record("Bob"))
+    book.journal.close()
+    # a crash in the middle of appending leaves half of a line
+    with open(filename + ".journal", "a", encoding="utf-8") as file:
+        file.write('{"op": "set", "name": "Cid", "rec')
+
+    reopened = open_journal_book(filename)
+    assert sorted(reopened.keys()) == ["Ann", "Bob"]
+    # changes after the torn line are not hidden by it on the next start
+    reopened.add_contact(make_record("Dan"))
+    reopened.journal.close()
+    again = open_journal_book(filename)
+    assert sorted(again.keys()) == ["Ann", "Bob", "Dan"]
+    again.journal.close()
+
+
+def test_journal_of_older_snapshot_is_ignored(tmp_path):
+    filename = str(tmp_path / "address_book.json")
+    book = open_journal_book(filename)
+    book.add_contact(make_record("Ann"))
+    book.journal.close()
+    stale = open(filename + ".journal", encoding="utf-8").read()
+    # the snapshot is rewritten with the journal folded into it
+    book = open_journal_book(filename)
+    book.journal.compact_after = 0
+    book.mark_changed("Ann")
+    book.save_to_file(filename)
+    book.journal.close()
+    with open(filename + ".journal", "w", encoding="utf-8") as file:
+        file.write(stale)
+
+    reopened = open_journal_book(filename)
+    assert sorted(reopened.keys()) == ["Ann"]
+    assert reopened.journal.entries == 0
+    reopened.journal.close()
+
+
+def test_journal_compaction_rewrites_snapshot(tmp_path):
+    filename = str(tmp_path / "address_book.json")
+    book = open_journal_book(filename)
+    book.journal.compact_after = 2
+    book.add_contact(make_record("Ann"))
+    book.save_to_file(filename)
+    assert not os.path.exists(filename)
+    book.add_contact(make_record("Bob"))
+    book.save_to_file(filename)
+    assert os.path.exists(filename)
+    assert book.journal.entries == 0
+    book.journal.close()
+    assert sorted(AddressBook.load_from_file(filename, storage="json").keys()) == ["Ann", "Bob"]
+
+
+def test_notebook_journal_round_trip(tmp_path):
+    filename = str(tmp_path / "note_book.json")
+    note_book = NoteBook.load_from_file(filename, storage="journal")
+    note_book.add_note(Note("first", ["a"]))
+    note_book.add_note(Note("second"))
+    note_book.save_to_file(filename)
+    note_book.edit_note(0, "changed", "b,c", "")
+    note_book.delete_note(1)
+    note_book.journal.close()
+
+    reopened = NoteBook.load_from_file(filename, storage="journal")
+    assert reopened.to_list() == [{"value": "changed", "tags": ["b", "c"]}]
+    reopened.journal.close()
+
+
+def read_object(tmp_path, text, chunk_size):
+    filename = tmp_path / "object.json"
+    filename.write_bytes(text.encode("utf-8"))
+    with open(filename, "rb") as file:
+        return list(iter_json_object(file, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_iter_json_object_matches_json_load(tmp_path, chunk_size):
+    data = {
+        "Ann": {"phones": ["0123456789"], "birthday": "01.02.1990"},
+        "Тарас": {"addresses": ["Київ, вул. Хрещатик 1"], "note": "emoji 🎂"},
+        "numbers": [12345678901234567890, -1.5e-3, 0],
+        "empty": {},
+        'escaped "key"': "line\nbreak",
+    }
+    text = json.dumps(data, ensure_ascii=False, indent=1)
+    assert read_object(tmp_path, text, chunk_size) == list(data.items())
+
+
+def test_iter_json_object_reads_empty_object(tmp_path):
+    assert read_object(tmp_path, " { } ", 1) == []
+
+
+def test_iter_json_object_rejects_truncated_file(tmp_path):
+    with pytest.raises(json.JSONDecodeError):
+        read_object(tmp_path, '{"Ann": {"phones": [', 4)
+
+
+def test_iter_json_object_reports_progress(tmp_path):
+    filename = tmp_path / "object.json"
+    filename.write_text(json.dumps({str(index): index for index in range(100)}))
+    reports = []
+    with open(filename, "rb") as file:
+        list(iter_json_object(file, lambda done, total: reports.append((done, total)), chunk_size=64))
+    assert reports[-1] == (filename.stat().st_size, filename.stat().st_size)
+
+
+def test_dump_json_object_round_trip():
+    items = [("Ann", {"phones": ["0123456789"]}), ("Київ", [1, 2])]
+    file = io.StringIO()
+    dump_json_object(iter(items), file)
+    assert json.loads(file.getvalue()) == dict(items)
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_json_round_trip(tmp_path, lazy):
+    filename = str(tmp_path / "address_book.json")
+    book = AddressBook.load_from_file(filename, storage="json", lazy=lazy)
+    book.add_contact(make_record("Ann", birthday="29.02.1992"))
+    book.add_contact(make_record("Тарас", "0987654321"))
+    book.add_email("Ann", "ann@example.com")
+    book.save_to_file(filename)
+
+    reopened = AddressBook.load_from_file(filename, storage="json", lazy=lazy)
+    assert reopened.to_dict() == book.to_dict()
+    assert reopened["Ann"].birthday.value == datetime(1992, 2, 29)
@@ -0,0 +1,64 @@
+from datetime import datetime
+import re
+import pytest
+from console_bot.validators import (
+    parse_date,
+    parse_dates,
+    validate_addresses,
+    validate_emails,
+    validate_phones,
+)
+
+DATES = [
+    "01.02.1990",
+    "1.2.1990",
+    "29.02.1992",
+    "29.02.1991",
+    "31.04.2000",
+    "00.01.2000",
+    "01.13.2000",
+    "001.02.1990",
+    "01.02.990",
+    "01.02.01990",
+    "01-02-1990",
+    "01.02.1990.",
+    "+1.02.1990",
+    "01.02.1990 ",
+    "",
+]
+
+
+def strptime_or_none(value):
+    try:
+        return datetime.strptime(value, "%d.%m.%Y")
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("value", DATES)
+def test_parse_date_agrees_with_strptime(value):
+    assert parse_date(value) == strptime_or_none(value)
+
+
+@pytest.mark.parametrize("value", [" 1.02.1990", "١.٠٢.١٩٩٠"])
+def test_parse_date_accepts_only_ascii_digits(value):
+    assert parse_date(value) is None
+
+
+def test_parse_dates():
+    assert parse_dates(DATES) == [strptime_or_none(value) for value in DATES]
+
+
+def test_validate_phones_agrees_with_pattern():
+    values = ["0123456789", "012345678", "01234567890", "012345678a", "", "+380123456"]
+    assert validate_phones(values) == [re.search(r"^[0-9]{10}$", value) is not None for value in values]
+
+
+def test_validate_emails_agrees_with_pattern():
+    values = ["ann@example.com", "ann@example", "ann.b+c@mail.co.uk", "@example.com", "ann@@example.com", ""]
+    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+    assert validate_emails(values) == [re.match(pattern, value) is not None for value in values]
+
+
+def test_validate_addresses():
+    assert validate_addresses(["Kyiv", "", None]) == [True, False, False]
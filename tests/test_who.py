@@ -0,0 +1,53 @@
+import pytest
+from console_bot.address_book import AddressBook, Record
+
+PHONES = {
+    "Ann": ["0501112233", "0671112233"],
+    "Bob": ["0501119999"],
+    "Cid": ["0501112233"],
+    "Dan": ["0931234567"],
+}
+
+
+def make_book():
+    book = AddressBook()
+    for name, phones in PHONES.items():
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        book.add_contact(record)
+    return book
+
+
+def scan(book, prefix):
+    """Answer of who computed by checking every phone of every record"""
+    owners = {}
+    for name, record in book.items():
+        for phone in record.phones:
+            if phone.value.startswith(prefix):
+                owners.setdefault(phone.value, set()).add(name)
+    lines = [f"{phone}: {', '.join(sorted(names))}" for phone, names in sorted(owners.items())]
+    return "\n".join(lines) if lines else f"No contacts with phone starting with {prefix}"
+
+
+@pytest.mark.parametrize("prefix", ["0", "050", "0501112233", "067", "0931", "099"])
+def test_who_agrees_with_scan(prefix):
+    book = make_book()
+    assert book.find_by_phone(prefix) == scan(book, prefix)
+
+
+def test_who_ignores_separators():
+    assert make_book().find_by_phone("(050) 111-22-33") == "0501112233: Ann, Cid"
+
+
+def test_who_follows_changes():
+    book = make_book()
+    book.find_by_phone("0")
+    book.change_contact("Ann", "0501112233", "0509990000")
+    book.delete("Bob")
+    assert book.find_by_phone("050") == scan(book, "050")
+    assert book.find_by_phone("0501112233") == "0501112233: Cid"
+
+
+def test_who_rejects_number_without_digits():
+    assert make_book().find_by_phone("abc") == "Invalid phone number: abc"